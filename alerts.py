@@ -0,0 +1,234 @@
+import os
+import json
+import time
+import shutil
+import bisect
+import subprocess
+import urllib.request
+from collections import namedtuple
+from datetime import datetime
+
+############################################################################################################
+# Threshold Alerts for the Observers
+#
+# Rules are kept in sorted threshold lists per (symbol, field, direction). On every tick only the rules
+# whose thresholds lie between the previous and the new value are looked at (found by bisection),
+# so many rules per symbol cost almost nothing when nothing is crossed. Fired alerts are de-duplicated
+# per rule and sent to pluggable sinks (log file, desktop notification, webhook).
+############################################################################################################
+
+ALERTS_FILE = "alerts.json"
+FIELDS = ("price", "rsi", "iv", "hist_volatility", "yz_volatility", "iv_hv", "iv_rank")
+
+# direction: "above" fires when the value rises to or above the threshold,
+#            "below" fires when the value falls to or below the threshold
+AlertRule = namedtuple("AlertRule", ["rule_id", "symbol", "field", "direction", "threshold", "message"], defaults=[""])
+
+
+class LogFileSink:
+    """
+    Appends alerts to a log file.
+    """
+
+    def __init__(self, path=os.path.join("alerts", "alerts.log")):
+        self.path = path
+
+    def send(self, alert):
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(self.path, "a") as file:
+            file.write(f"{alert['time']} {alert['symbol']} {alert['text']}\n")
+
+class DesktopSink:
+    """
+    Shows alerts as desktop notifications (notify-send or osascript), printing them if neither exists.
+    """
+
+    def send(self, alert):
+        title = f"Option Selling Alert - {alert['symbol']}"
+        try:
+            if shutil.which("notify-send"):
+                subprocess.Popen(["notify-send", title, alert["text"]])
+            elif shutil.which("osascript"):
+                script = f'display notification {json.dumps(alert["text"])} with title {json.dumps(title)}'
+                subprocess.Popen(["osascript", "-e", script])
+            else:
+                print(f"{title}: {alert['text']}")
+        except Exception as e:
+            print(f"Error showing notification: {e}")
+
+class WebhookSink:
+    """
+    Posts alerts as JSON to a webhook. Without a URL it only collects the payloads (stub for testing).
+    """
+
+    def __init__(self, url=None, timeout=5):
+        self.url = url
+        self.timeout = timeout
+        self.sent = []
+
+    def send(self, alert):
+        self.sent.append(alert)
+        if not self.url:
+            return
+        request = urllib.request.Request(
+            self.url, data=json.dumps(alert).encode("utf-8"), headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except Exception as e:
+            print(f"Error posting alert to webhook: {e}")
+
+class AlertEngine:
+    """
+    Evaluates threshold rules on incoming values and dispatches fired alerts to the sinks.
+    """
+
+    def __init__(self, sinks=None, cooldown=900):
+        self.sinks = list(sinks) if sinks is not None else [LogFileSink()]
+        self.cooldown = cooldown
+        self.rules = {}
+        # (symbol, field, direction) -> ([sorted thresholds], [rule ids in the same order])
+        self._index = {}
+        self._last_values = {}
+        self._last_fired = {}
+
+    def add_rule(self, rule, timestamp=None):
+        """
+        Adds or replaces a rule and returns the alerts it sent. A new rule that is already satisfied by
+        the last known value of its field fires right away; re-adding an identical rule does nothing.
+        """
+        if self.rules.get(rule.rule_id) == rule:
+            return []
+        if rule.field not in FIELDS:
+            raise ValueError(f"Unknown alert field '{rule.field}'. Available: {', '.join(FIELDS)}")
+        if rule.direction not in ("above", "below"):
+            raise ValueError(f"Alert direction must be 'above' or 'below', not '{rule.direction}'")
+        if rule.rule_id in self.rules:
+            self.remove_rule(rule.rule_id)
+
+        self.rules[rule.rule_id] = rule
+        thresholds, rule_ids = self._index.setdefault((rule.symbol, rule.field, rule.direction), ([], []))
+        position = bisect.bisect_right(thresholds, rule.threshold)
+        thresholds.insert(position, rule.threshold)
+        rule_ids.insert(position, rule.rule_id)
+
+        value = self._last_values.get((rule.symbol, rule.field))
+        if value is None or not (value >= rule.threshold if rule.direction == "above" else value <= rule.threshold):
+            return []
+        return self._fire([rule.rule_id], value, time.time() if timestamp is None else timestamp)
+
+    def remove_rule(self, rule_id):
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return
+        thresholds, rule_ids = self._index[(rule.symbol, rule.field, rule.direction)]
+        position = rule_ids.index(rule_id)
+        del thresholds[position]
+        del rule_ids[position]
+
+    def _crossed(self, key, previous, value):
+        """
+        Returns the ids of the rules whose thresholds were crossed by the move from previous to value.
+        On the first value of a field, every rule that is already satisfied counts as crossed.
+        """
+        entry = self._index.get(key)
+        if not entry or not entry[0]:
+            return []
+        thresholds, rule_ids = entry
+        if key[2] == "above":
+            low = 0 if previous is None else bisect.bisect_right(thresholds, previous)
+            high = bisect.bisect_right(thresholds, value)
+        else:
+            low = bisect.bisect_left(thresholds, value)
+            high = len(thresholds) if previous is None else bisect.bisect_left(thresholds, previous)
+        return rule_ids[low:high]
+
+    def on_tick(self, symbol, values, timestamp=None):
+        """
+        Processes new values ({field: value}) for a symbol and returns the alerts that were sent.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        fired = []
+        for field, value in values.items():
+            if value is None or value != value:  # skip missing and NaN values
+                continue
+            value = float(value)
+            previous = self._last_values.get((symbol, field))
+            self._last_values[(symbol, field)] = value
+            if previous == value:
+                continue
+
+            for direction in ("above", "below"):
+                fired.extend(self._fire(self._crossed((symbol, field, direction), previous, value), value, timestamp))
+        return fired
+
+    def _fire(self, rule_ids, value, timestamp):
+        """
+        Sends the alerts of the rules that are not in their cooldown and returns them.
+        """
+        fired = []
+        for rule_id in rule_ids:
+            last_fired = self._last_fired.get(rule_id)
+            if last_fired is not None and timestamp - last_fired < self.cooldown:
+                continue
+            self._last_fired[rule_id] = timestamp
+            fired.append(self._alert(self.rules[rule_id], value, timestamp))
+
+        for alert in fired:
+            for sink in self.sinks:
+                try:
+                    sink.send(alert)
+                except Exception as e:
+                    print(f"Error sending alert via {type(sink).__name__}: {e}")
+        return fired
+
+    @staticmethod
+    def _alert(rule, value, timestamp):
+        text = rule.message or f"{rule.field} {'rose above' if rule.direction == 'above' else 'fell below'} {rule.threshold:g}"
+        return {
+            "rule_id": rule.rule_id,
+            "symbol": rule.symbol,
+            "field": rule.field,
+            "direction": rule.direction,
+            "threshold": rule.threshold,
+            "value": value,
+            "text": f"{text} (now {value:.4g})",
+            "time": datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+def load_rules(path=ALERTS_FILE):
+    """
+    Loads alert rules from a JSON file containing a list of rule objects, e.g.
+    {"rule_id": "spy-rsi-30", "symbol": "SPY", "field": "rsi", "direction": "below", "threshold": 30}
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        return [AlertRule(**entry) for entry in json.load(file)]
+
+def create_engine(path=ALERTS_FILE, webhook_url=None):
+    """
+    Creates an engine with the rules from the alerts file, logging to a file and the desktop.
+    """
+    sinks = [LogFileSink(), DesktopSink()]
+    if webhook_url:
+        sinks.append(WebhookSink(webhook_url))
+    engine = AlertEngine(sinks)
+    for rule in load_rules(path):
+        engine.add_rule(rule)
+    return engine
+
+def strike_rule(symbol, strike_price, expiry, within_pct=0.02):
+    """
+    Builds the rule that fires when the price comes within `within_pct` of a short put's strike.
+    """
+    return AlertRule(
+        f"strike:{symbol}:{strike_price:g}:{expiry}",
+        symbol,
+        "price",
+        "below",
+        strike_price * (1 + within_pct),
+        f"Price within {within_pct:.0%} of the {strike_price:g} put strike ({expiry})",
+    )
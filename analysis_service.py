@@ -0,0 +1,446 @@
+import json
+import time
+import zlib
+import argparse
+import threading
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import matplotlib
+matplotlib.use("Agg")  # headless: the strategy module imports pyplot
+import numpy as np
+import pandas as pd
+import yfinance as yf
+import vector_indicators as vi
+from price_series import PriceSeries
+from entry_rules import compile_rule, indicator_fields
+from trade_management import ManagementRule
+import option_selling_strategy_etf as strategy
+
+############################################################################################################
+# Local Analysis Service
+#
+# A long-running HTTP/JSON server (standard library only) in front of the strategy functions. Price
+# history, IV and the per-year indicator analysis of every symbol stay in memory and are refreshed
+# in the background after a TTL while requests keep getting the cached values, so they only pay for the
+# computation that is specific to them. The first load of a symbol happens once under a per-symbol lock.
+# Latency and throughput are tracked per endpoint and served under /stats.
+############################################################################################################
+
+DEFAULT_PORT = 8765
+HISTORY_YEARS = 6
+
+
+class YahooBackend:
+    """
+    Loads daily bars and the average call IV from Yahoo Finance.
+    """
+
+    def history(self, symbol, start, end):
+        return PriceSeries.from_frame(yf.download(symbol, start=start, end=end, progress=False), symbol)
+
+    def implied_volatility(self, symbol):
+        return strategy.get_iv(symbol)
+
+class MockBackend:
+    """
+    Generates reproducible random-walk bars and IV per symbol for offline testing.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def history(self, symbol, start, end):
+        self.calls += 1
+        time.sleep(self.latency)
+        rng = np.random.default_rng(zlib.crc32(symbol.encode("utf-8")))
+        index = pd.bdate_range(start, min(pd.Timestamp(end), pd.Timestamp(datetime.now().date())))
+        close = rng.uniform(20, 500) * np.exp(np.cumsum(rng.normal(0.0003, 0.012, len(index))))
+        open_ = close * np.exp(rng.normal(0, 0.004, len(index)))
+        frame = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) * 1.004,
+            "Low": np.minimum(open_, close) * 0.996,
+            "Close": close,
+            "Volume": rng.integers(1_000_000, 50_000_000, len(index)).astype(np.float64),
+        }, index=index)
+        return PriceSeries.from_frame(frame, symbol)
+
+    def implied_volatility(self, symbol):
+        self.calls += 1
+        time.sleep(self.latency)
+        return 0.12 + (zlib.crc32(symbol.encode("utf-8")) % 300) / 1000
+
+class SymbolCache:
+    """
+    Keeps price history, IV and computed analyses per symbol in memory. Only the first load of a symbol
+    blocks; after `ttl` (history) or `iv_ttl` (IV) the stale values keep being served while a
+    background thread reloads them.
+    """
+
+    def __init__(self, backend, ttl=300, iv_ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+        self.iv_ttl = iv_ttl
+        self._entries = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._counters_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _lock(self, symbol):
+        with self._locks_lock:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _count(self, name):
+        with self._counters_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _load_history(self, symbol):
+        year = datetime.now().year
+        series = self.backend.history(symbol, f"{year - HISTORY_YEARS}-01-01", f"{year}-12-31")
+        if series.empty:
+            raise LookupError(f"No price data for {symbol}")
+        return series
+
+    @staticmethod
+    def _new_entry(series, iv, iv_loaded):
+        # Analyses and backtests are only valid for the history they were computed from
+        now = time.monotonic()
+        return {"series": series, "loaded": now, "iv": iv, "iv_loaded": iv_loaded if iv_loaded is not None else now,
+                "analyses": {}, "backtests": {}, "lock": threading.Lock(), "refreshing": False}
+
+    def entry(self, symbol):
+        """
+        Returns the cache entry of a symbol, loading it on first use and refreshing it in the background
+        once expired.
+        """
+        entry = self._entries.get(symbol)
+        if entry is None:
+            with self._lock(symbol):
+                entry = self._entries.get(symbol)
+                if entry is None:
+                    self._count("misses")
+                    series = self._load_history(symbol)
+                    entry = self._new_entry(series, self.backend.implied_volatility(symbol), None)
+                    self._entries[symbol] = entry
+                    return entry
+        self._count("hits")
+
+        now = time.monotonic()
+        reload_history = now - entry["loaded"] > self.ttl
+        reload_iv = now - entry["iv_loaded"] > self.iv_ttl
+        if reload_history or reload_iv:
+            with self._lock(symbol):
+                if entry["refreshing"]:
+                    return entry
+                entry["refreshing"] = True
+            threading.Thread(target=self._refresh, args=(symbol, entry, reload_history, reload_iv), daemon=True).start()
+        return entry
+
+    def _refresh(self, symbol, entry, reload_history, reload_iv):
+        """
+        Reloads an entry's IV and/or history without blocking requests, which keep the stale entry meanwhile.
+        """
+        self._count("refreshes")
+        try:
+            iv, iv_loaded = entry["iv"], entry["iv_loaded"]
+            if reload_iv:
+                iv, iv_loaded = self.backend.implied_volatility(symbol), time.monotonic()
+            if reload_history:
+                self._entries[symbol] = self._new_entry(self._load_history(symbol), iv, iv_loaded)
+            else:
+                entry["iv"], entry["iv_loaded"] = iv, iv_loaded
+        except Exception as e:
+            print(f"Error refreshing {symbol}, keeping cached data: {e}")
+        finally:
+            entry["refreshing"] = False
+
+    @staticmethod
+    def memoize(entry, table, key, compute):
+        """
+        Returns entry[table][key], computing it once even when requests for it arrive concurrently.
+        """
+        with entry["lock"]:
+            if key not in entry[table]:
+                entry[table][key] = compute()
+            return entry[table][key]
+
+    def analysis(self, symbol, year):
+        """
+        Returns the indicators and support/resistance levels of a symbol for a year (as in the ETF analysis).
+        """
+        entry = self.entry(symbol)
+        return entry, self.memoize(entry, "analyses", year, lambda: analyze(entry["series"], year))
+
+    def symbols(self):
+        return sorted(self._entries)
+
+def analyze(series, year):
+    """
+    Computes the indicators of the analysis period (previous and selected year); the 200-day average
+    uses the two years before as warm-up, like the ETF analysis.
+    """
+    data = series.between(f"{year - 2}-01-01", f"{year}-12-31")
+    year_start, year_end = data.positions(f"{year - 1}-01-01", f"{year}-12-31")
+    data_for_year = data[year_start:year_end]
+    if len(data_for_year) < 2:
+        raise LookupError(f"Not enough data for {series.symbol} in {year}")
+
+    maxima_points, minima_points = strategy.detect_trends(data_for_year)
+    rolling_mean, upper_band, lower_band = strategy.calculate_bollinger_bands(data_for_year)
+    moving_average_200 = vi.rolling_mean(data.close, 200)
+    return {
+        "data": data_for_year,
+        "resistance_levels": maxima_points["Close"],
+        "support_levels": minima_points["Close"],
+        "rsi": strategy.calculate_rsi(data_for_year),
+        "bollinger_bands": (rolling_mean, upper_band, lower_band),
+        "moving_average_200": moving_average_200[year_start:year_end],
+        "moving_average_200_value": float(moving_average_200[-1]),
+    }
+
+class EndpointStats:
+    """
+    Request counts, errors and latency percentiles per endpoint (latencies of the last `samples` requests).
+    """
+
+    def __init__(self, samples=10000):
+        self.started = time.monotonic()
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, seconds, error=False):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {"count": 0, "errors": 0, "latencies": deque(maxlen=self.samples), "recent": deque()})
+            stats["count"] += 1
+            stats["errors"] += int(error)
+            stats["latencies"].append(seconds)
+            now = time.monotonic()
+            stats["recent"].append(now)
+            while stats["recent"] and now - stats["recent"][0] > 60:
+                stats["recent"].popleft()
+
+    def summary(self):
+        with self._lock:
+            uptime = time.monotonic() - self.started
+            summary = {"uptime_seconds": round(uptime, 1), "endpoints": {}}
+            for endpoint, stats in sorted(self._endpoints.items()):
+                latencies = np.fromiter(stats["latencies"], dtype=np.float64) * 1000
+                summary["endpoints"][endpoint] = {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "requests_per_second": round(stats["count"] / uptime, 2) if uptime else 0.0,
+                    "requests_last_minute": len(stats["recent"]),
+                    "latency_ms": {
+                        "mean": round(float(latencies.mean()), 3),
+                        "p50": round(float(np.percentile(latencies, 50)), 3),
+                        "p95": round(float(np.percentile(latencies, 95)), 3),
+                        "p99": round(float(np.percentile(latencies, 99)), 3),
+                        "max": round(float(latencies.max()), 3),
+                    },
+                }
+            return summary
+
+def _finite(values):
+    """
+    Converts an array into a JSON-friendly list (NaN becomes None).
+    """
+    return [None if not np.isfinite(value) else round(float(value), 4) for value in values]
+
+def _param(params, name, default=None, convert=str):
+    if name not in params:
+        return default
+    try:
+        return convert(params[name][0])
+    except ValueError:
+        raise ValueError(f"Invalid value for '{name}': {params[name][0]}")
+
+def _symbol_and_year(params):
+    symbol = _param(params, "symbol")
+    if not symbol:
+        raise ValueError("Missing query parameter 'symbol'")
+    return symbol.upper(), _param(params, "year", datetime.now().year, int)
+
+class AnalysisService:
+    """
+    Request handlers of the service; each returns a JSON-serializable dict.
+    """
+
+    def __init__(self, backend, ttl=300, iv_ttl=60):
+        self.cache = SymbolCache(backend, ttl, iv_ttl)
+        self.stats = EndpointStats()
+        self.routes = {
+            "/health": self.health,
+            "/stats": self.statistics,
+            "/indicators": self.indicators,
+            "/recommendation": self.recommendation,
+            "/backtest": self.backtest,
+        }
+
+    def health(self, params):
+        return {"status": "ok", "backend": type(self.cache.backend).__name__, "symbols": self.cache.symbols()}
+
+    def statistics(self, params):
+        summary = self.stats.summary()
+        summary["cache"] = {"hits": self.cache.hits, "misses": self.cache.misses, "refreshes": self.cache.refreshes, "symbols": len(self.cache.symbols())}
+        return summary
+
+    def indicators(self, params):
+        symbol, year = _symbol_and_year(params)
+        tail = _param(params, "tail", 1, int)
+        entry, analysis = self.cache.analysis(symbol, year)
+        data = analysis["data"]
+        rolling_mean, upper_band, lower_band = analysis["bollinger_bands"]
+        rows = slice(max(len(data) - tail, 0), len(data))
+        return {
+            "symbol": symbol,
+            "year": year,
+            "iv": entry["iv"],
+            "dates": [str(date)[:10] for date in data.index[rows]],
+            "close": _finite(data.close[rows]),
+            "rsi": _finite(analysis["rsi"][rows]),
+            "bollinger_mean": _finite(rolling_mean[rows]),
+            "bollinger_upper": _finite(upper_band[rows]),
+            "bollinger_lower": _finite(lower_band[rows]),
+            "moving_average_200": _finite(analysis["moving_average_200"][rows]),
+            "support_levels": _finite(analysis["support_levels"]),
+            "resistance_levels": _finite(analysis["resistance_levels"]),
+        }
+
+    def recommendation(self, params):
+        symbol, year = _symbol_and_year(params)
+        entry, analysis = self.cache.analysis(symbol, year)
+        iv = entry["iv"] or 0.0
+        result = strategy.generate_put_recommendation(analysis["data"], analysis["support_levels"], analysis["moving_average_200_value"], iv)
+        if isinstance(result, str):
+            return {"symbol": symbol, "year": year, "recommendation": result, "strike_price": None, "dte": None, "iv": iv}
+        recommendation, strike_price, dte = result
+        return {
+            "symbol": symbol,
+            "year": year,
+            "current_price": float(analysis["data"].close[-1]),
+            "moving_average_200": analysis["moving_average_200_value"],
+            "iv": iv,
+            "strike_price": strike_price,
+            "dte": dte,
+            "recommendation": recommendation,
+        }
+
+    def backtest(self, params):
+        """
+        Backtests the recommended put (or `strike`/`dte`), optionally with an entry `rule` and a
+        management rule (`take_profit`, `stop_loss`, `close_dte`, `roll`).
+        """
+        symbol, year = _symbol_and_year(params)
+        entry, analysis = self.cache.analysis(symbol, year)
+        strike_price = _param(params, "strike", None, float)
+        dte = _param(params, "dte", None, int)
+        if strike_price is None or dte is None:
+            recommended = self.recommendation(params)
+            strike_price = recommended["strike_price"] if strike_price is None else strike_price
+            dte = recommended["dte"] if dte is None else dte
+            if strike_price is None:
+                raise LookupError(f"No recommendation for {symbol} in {year}; pass 'strike' and 'dte'")
+
+        rule = _param(params, "rule")
+        management = ManagementRule(
+            _param(params, "take_profit", None, float),
+            _param(params, "stop_loss", None, float),
+            _param(params, "close_dte", None, int),
+            _param(params, "roll", "false").lower() in ("1", "true", "yes"),
+        )
+        management = management if management != ManagementRule() else None
+
+        def run():
+            data = analysis["data"]
+            entry_mask = compile_rule(rule)(indicator_fields(data.close, analysis["moving_average_200"])) if rule else None
+            total_profit, avg_profit = strategy.backtest_strategy(data, strike_price, dte, entry_mask, management)
+            return {"total_profit": float(total_profit), "avg_profit": float(avg_profit)}
+
+        result = self.cache.memoize(entry, "backtests", (year, strike_price, dte, rule, management), run)
+        return {
+            "symbol": symbol,
+            "year": year,
+            "strike_price": strike_price,
+            "dte": dte,
+            "entry_rule": rule,
+            "management": management._asdict() if management else None,
+            # Managed and plain backtests use different premium models; only compare equal pricing
+            "pricing": strategy.backtest_pricing(management),
+            **result,
+        }
+
+    def handle(self, path, params):
+        """
+        Dispatches a request and returns (HTTP status, response dict), recording its latency.
+        """
+        started = time.perf_counter()
+        handler = self.routes.get(path)
+        if handler is None:
+            status, body = 404, {"error": f"Unknown endpoint '{path}'. Available: {', '.join(self.routes)}"}
+        else:
+            try:
+                status, body = 200, handler(params)
+            except ValueError as e:
+                status, body = 400, {"error": str(e)}
+            except LookupError as e:
+                status, body = 404, {"error": str(e)}
+            except Exception as e:
+                print(f"Error handling {path}: {e}")
+                status, body = 500, {"error": str(e)}
+        self.stats.record(path if handler else "unknown", time.perf_counter() - started, status >= 400)
+        return status, body
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT, quiet=True):
+    """
+    Creates a threading HTTP server answering GET requests with the service's JSON responses.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            status, body = service.handle(url.path.rstrip("/") or "/health", parse_qs(url.query))
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recommendations, backtests and indicators as JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--mock", action="store_true", help="use generated data instead of Yahoo Finance")
+    parser.add_argument("--ttl", type=int, default=300, help="seconds before price history is reloaded")
+    parser.add_argument("--iv-ttl", type=int, default=60, help="seconds before the IV is reloaded")
+    parser.add_argument("--warm", default="", help="comma-separated symbols to load at start, e.g. SPY,QQQ")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    service = AnalysisService(MockBackend() if args.mock else YahooBackend(), args.ttl, args.iv_ttl)
+    for symbol in filter(None, args.warm.upper().split(",")):
+        print(f"Loading {symbol}...")
+        service.cache.analysis(symbol, datetime.now().year)
+
+    server = make_server(service, args.host, args.port, quiet=not args.verbose)
+    print(f"Serving on http://{args.host}:{args.port} (endpoints: {', '.join(service.routes)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
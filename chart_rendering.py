@@ -0,0 +1,228 @@
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection
+import numpy as np
+
+############################################################################################################
+# Chart Rendering for the Trend and Backtest Plot
+#
+# Long histories are decimated to the pixel width of the saved image with Largest-Triangle-Three-Buckets
+# (LTTB, with min/max preselection for very long buckets),
+# support/resistance levels are drawn as one LineCollection each, and the figure skeleton is reusable
+# across symbols so batch runs only update artist data instead of rebuilding the figure.
+############################################################################################################
+
+# Long buckets are reduced to the min/max of this many sub-buckets before the LTTB pass
+PRESELECT_SPLITS = 4
+
+
+def lttb_indices_many(x, ys, threshold):
+    """
+    Runs LTTB on several series that share x in one pass over the buckets. Missing values (NaN) are
+    never selected. Returns one array of selected indices per series.
+
+    Buckets longer than 2 * PRESELECT_SPLITS points are first reduced to the minimum and maximum of
+    PRESELECT_SPLITS sub-buckets (MinMaxLTTB), so the sequential LTTB pass only looks at a few
+    candidates per bucket; shorter buckets are searched exactly.
+    """
+    ys = np.atleast_2d(np.asarray(ys, dtype=float))
+    k, n = ys.shape
+    valid = np.isfinite(ys)
+    if threshold >= n or threshold < 3 or not valid.any():
+        return [np.flatnonzero(row) for row in valid]
+
+    # Work relative to the first point so the bucket sums stay precise for nanosecond timestamps
+    x = np.asarray(x, dtype=float) - float(x[0])
+    rows = np.arange(k)
+    has_values = valid.any(axis=1)
+    first = np.argmax(valid, axis=1)
+    last = n - 1 - np.argmax(valid[:, ::-1], axis=1)
+
+    # First and last valid points are always kept, the rest is split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # The target of each bucket is the average of the next bucket (the last point for the last bucket).
+    # Missing points are taken out of the full bucket sums afterwards, which is cheap for few NaNs.
+    complete = bool(valid.all())
+    counts = np.tile((ends - starts).astype(float), (k, 1))
+    sum_x = np.tile(np.add.reduceat(x[:n - 1], starts), (k, 1))
+    sum_y = np.add.reduceat((ys if complete else np.where(valid, ys, 0.0))[:, :n - 1], starts, axis=1)
+    if not complete:
+        missing_rows, missing_points = np.divmod(np.flatnonzero(~valid), n)
+        inside = (missing_points >= 1) & (missing_points < n - 1)
+        missing_rows, missing_points = missing_rows[inside], missing_points[inside]
+        flat = missing_rows * len(starts) + np.searchsorted(starts, missing_points, side='right') - 1
+        counts -= np.bincount(flat, minlength=counts.size).reshape(counts.shape)
+        sum_x -= np.bincount(flat, weights=x[missing_points], minlength=counts.size).reshape(counts.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x, mean_y = sum_x / counts, sum_y / counts
+    next_x = np.concatenate((mean_x[:, 1:], x[last][:, None]), axis=1)
+    next_y = np.concatenate((mean_y[:, 1:], ys[rows, last][:, None]), axis=1)
+    empty = np.concatenate((counts[:, 1:] == 0, np.ones((k, 1), dtype=bool)), axis=1)
+    next_x = np.where(empty, x[last][:, None], next_x)
+    next_y = np.where(empty, ys[rows, last][:, None], next_y)
+
+    # Candidate points per bucket: (series x buckets x candidates)
+    if (ends - starts).max() <= 2 * PRESELECT_SPLITS:
+        width = int((ends - starts).max())
+        points = starts[:, None] + np.arange(width)[None, :]
+        candidates = np.broadcast_to(np.where(points < ends[:, None], points, -1), (k, len(starts), width))
+    else:
+        sub_edges = np.linspace(starts, ends, PRESELECT_SPLITS + 1, axis=1).astype(np.int64)
+        sub_starts, lengths = sub_edges[:, :-1].ravel(), np.diff(sub_edges, axis=1).ravel()
+        span = slice(sub_starts[0], sub_starts[-1] + lengths[-1])
+        offsets = sub_starts - span.start
+        values = ys[:, span]
+        width = values.shape[1]
+        # Sub-bucket bounds in the flattened (series x span) block
+        flat_starts = (rows[:, None] * width + offsets[None, :]).ravel()
+        flat_ends = flat_starts + np.tile(lengths, k)
+        picks = []
+        for reduce in (np.fmin, np.fmax):
+            # fmin/fmax skip NaN; the first point equal to the extreme is the candidate
+            extreme = reduce.reduceat(values, offsets, axis=1)
+            hits = np.flatnonzero(values == np.repeat(extreme, lengths, axis=1))
+            first_hit = hits[np.minimum(np.searchsorted(hits, flat_starts), len(hits) - 1)]
+            # A sub-bucket without values has no hit of its own and no candidate
+            own = (first_hit >= flat_starts) & (first_hit < flat_ends)
+            picks.append(np.where(own, first_hit % width + span.start, -1).reshape(k, len(starts), -1))
+        candidates = np.concatenate(picks, axis=2)
+    safe = np.maximum(candidates, 0)
+    candidate_x = x[safe]
+    candidate_y = ys[rows[:, None, None], safe]
+    candidate_valid = (candidates >= 0) & valid[rows[:, None, None], safe]
+
+    selected = np.full((k, threshold), -1, dtype=np.int64)
+    selected[:, 0] = first
+    selected[:, -1] = last
+
+    a = first.copy()
+    for j in range(len(starts)):
+        x_a, y_a = x[a], ys[rows, a]
+        area = np.abs(
+            (x_a - next_x[:, j])[:, None] * (candidate_y[:, j] - y_a[:, None])
+            - (x_a[:, None] - candidate_x[:, j]) * (next_y[:, j] - y_a)[:, None]
+        )
+        area = np.where(candidate_valid[:, j], area, -1.0)
+        best = np.argmax(area, axis=1)
+        found = area[rows, best] >= 0
+        pick = candidates[rows, j, best]
+        a = np.where(found, pick, a)
+        selected[:, j + 1] = np.where(found, pick, -1)
+
+    return [np.unique(row[row >= 0]) if has else np.empty(0, dtype=np.int64) for row, has in zip(selected, has_values)]
+
+def lttb_indices(x, y, threshold):
+    """
+    Selects the indices of `threshold` points that preserve the visual shape of (x, y) using LTTB.
+    """
+    return lttb_indices_many(x, y, threshold)[0]
+
+def decimate(x, y, threshold):
+    """
+    Drops missing values and downsamples (x, y) to at most `threshold` points with LTTB.
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    indices = lttb_indices(x, y, threshold)
+    return x[indices], y[indices]
+
+def _date_offsets(index):
+    """
+    Returns the matplotlib date number of the first timestamp and the offsets of all timestamps in days,
+    without converting every timestamp through date2num.
+    """
+    ns = np.asarray(index, dtype="datetime64[ns]").view(np.int64)
+    if len(ns) == 0:
+        return 0.0, np.empty(0)
+    return float(mdates.date2num(np.datetime64(int(ns[0]), "ns"))), (ns - ns[0]) / 86_400e9
+
+def _level_segments(levels):
+    """
+    Builds horizontal segments spanning the whole axes width for each level.
+    """
+    levels = np.asarray(levels, dtype=float).ravel()
+    segments = np.zeros((len(levels), 2, 2))
+    segments[:, 1, 0] = 1.0
+    segments[:, :, 1] = levels[:, None]
+    return segments
+
+class TrendChart:
+    """
+    Reusable figure skeleton with price/indicator panel and RSI panel.
+    """
+
+    def __init__(self, figsize=(16, 12), save_dpi=None):
+        # Series are decimated to the pixel width of the saved image, not of the screen figure
+        self.save_dpi = save_dpi
+        self.fig, (self.ax_price, self.ax_rsi) = plt.subplots(2, 1, figsize=figsize, gridspec_kw={'height_ratios': [3, 1]})
+        ax1, ax2 = self.ax_price, self.ax_rsi
+
+        # Upper plot: Price and indicators
+        self.close_line, = ax1.plot([], [], color='blue', alpha=0.6)
+        self.rolling_mean_line, = ax1.plot([], [], label="20-Day Moving Average", color='black', linestyle='--', alpha=0.7)
+        self.upper_band_line, = ax1.plot([], [], label="Upper Bollinger Band", color='purple', linestyle='--', alpha=0.7)
+        self.lower_band_line, = ax1.plot([], [], label="Lower Bollinger Band", color='purple', linestyle='--', alpha=0.7)
+        self.ma200_line, = ax1.plot([], [], label="200-Day Moving Average", color='cyan', linestyle='-', linewidth=1.5)
+        self.trendline_line, = ax1.plot([], [], color='orange', linestyle='-')
+
+        # Levels use axes coordinates on x so they always span the full width, like axhline
+        self.resistance_lines = LineCollection([], colors='red', linestyles='--', alpha=0.7, transform=ax1.get_yaxis_transform())
+        self.support_lines = LineCollection([], colors='green', linestyles='--', alpha=0.7, transform=ax1.get_yaxis_transform())
+        ax1.add_collection(self.resistance_lines, autolim=False)
+        ax1.add_collection(self.support_lines, autolim=False)
+
+        ax1.set_ylabel('Price in USD')
+        ax1.grid(True)
+        ax1.xaxis_date()
+
+        # Lower plot: RSI
+        self.rsi_line, = ax2.plot([], [], label="RSI", color='darkblue', alpha=0.8)
+        ax2.axhline(70, color='red', linestyle='--', alpha=0.7, label='Overbought (70)')
+        ax2.axhline(30, color='green', linestyle='--', alpha=0.7, label='Oversold (30)')
+        ax2.set_title('Relative Strength Index (RSI)')
+        ax2.set_xlabel('Date')
+        ax2.set_ylabel('RSI')
+        ax2.legend(loc='upper left')
+        ax2.grid(True)
+        ax2.xaxis_date()
+
+        ax1.set_title(" ")
+        self.fig.tight_layout()
+
+    def pixel_width(self):
+        """
+        Returns the width of the price axes in pixels at the save resolution (figure dpi if not set).
+        """
+        dpi = self.save_dpi or self.fig.dpi
+        return max(int(self.ax_price.get_position().width * self.fig.get_figwidth() * dpi), 3)
+
+    def update(self, symbol, title, index, close, rolling_mean, upper_band, lower_band, moving_average_200,
+               trendline, slope, rsi, resistance_levels, support_levels):
+        """
+        Replaces the data of all artists and returns the figure.
+        """
+        origin, offsets = _date_offsets(index)
+        lines = (self.close_line, self.rolling_mean_line, self.upper_band_line, self.lower_band_line,
+                 self.ma200_line, self.trendline_line, self.rsi_line)
+        values = np.vstack([
+            np.asarray(series, dtype=float).ravel()
+            for series in (close, rolling_mean, upper_band, lower_band, moving_average_200, trendline, rsi)
+        ])
+        # All series share the dates, so they are decimated together and only the kept dates are converted
+        for line, row, indices in zip(lines, values, lttb_indices_many(offsets, values, self.pixel_width())):
+            line.set_data(origin + offsets[indices], row[indices])
+
+        self.close_line.set_label(f'{symbol} Closing Price')
+        self.trendline_line.set_label(f"Trendline (Slope: {slope:.2f})")
+        self.resistance_lines.set_segments(_level_segments(resistance_levels))
+        self.support_lines.set_segments(_level_segments(support_levels))
+
+        for ax in (self.ax_price, self.ax_rsi):
+            ax.relim()
+            ax.autoscale_view()
+
+        self.ax_price.set_title(title)
+        self.ax_price.legend(loc='upper left')
+        return self.fig
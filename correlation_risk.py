@@ -0,0 +1,294 @@
+import argparse
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+############################################################################################################
+# Rolling Correlation and Concentration Risk of the Short-Put Book
+#
+# The covariance of daily log returns over a window is kept incrementally: a ring buffer of the last
+# `window` return rows plus running sums and a running cross-product matrix. A new bar adds its outer
+# product and removes the one of the bar leaving the window, which is O(n^2) per bar instead of
+# recomputing from the window. The sums are rebuilt from the buffer once per window to stop floating
+# point drift. Open puts from the trade log are turned into dollar deltas and their volatility is
+# combined with the covariance matrix to show how much of the book's risk is diversified away.
+############################################################################################################
+
+TRADING_DAYS_PER_YEAR = 252
+CONTRACT_SIZE = 100
+
+# Regular US session; daily bars are only final after the close
+EXCHANGE_TIMEZONE = ZoneInfo("America/New_York")
+SESSION_OPEN = time(9, 30)
+SESSION_CLOSE = time(16, 0)
+
+
+def _exchange_now(now=None):
+    return now.astimezone(EXCHANGE_TIMEZONE) if now is not None else datetime.now(EXCHANGE_TIMEZONE)
+
+def session_open(now=None):
+    """
+    Returns True during the regular session (holidays are not known and count as trading days).
+    """
+    now = _exchange_now(now)
+    return now.weekday() < 5 and SESSION_OPEN <= now.time() < SESSION_CLOSE
+
+def last_completed_session(now=None):
+    """
+    Returns the date of the latest weekday whose session has closed.
+    """
+    now = _exchange_now(now)
+    day = now.date()
+    if now.weekday() >= 5 or now.time() < SESSION_CLOSE:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+def completed_bars(close, now=None):
+    """
+    Drops the daily bars of sessions that have not closed yet (today's bar during market hours).
+    """
+    return close[pd.DatetimeIndex(close.index).date <= last_completed_session(now)]
+
+
+class RollingCovariance:
+    """
+    Rolling covariance/correlation of returns for a fixed list of symbols, updated per bar.
+    Missing returns (NaN) count as no move.
+    """
+
+    def __init__(self, symbols, window=63):
+        self.symbols = list(symbols)
+        self.window = window
+        self._column = {symbol: column for column, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+        self._buffer = np.zeros((window, n))
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._position = 0
+        self.count = 0
+        self._updates = 0
+        # Date and closes of the last completed bar
+        self.last_date = None
+        self.last_close = None
+        # Return of the session in progress; counted as the newest row until the bar is completed
+        self._open_row = None
+
+    @classmethod
+    def from_closes(cls, close, symbols, window=63):
+        """
+        Builds the covariance from a dates x symbols matrix (or DataFrame) of closing prices.
+        """
+        rolling = cls(symbols, window)
+        if isinstance(close, pd.DataFrame):
+            close = close.reindex(columns=rolling.symbols).ffill()
+            if len(close):
+                rolling.last_date = close.index[-1]
+                rolling.last_close = close.iloc[-1].to_numpy(dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        returns = np.diff(np.log(close), axis=0)[-window:] if len(close) > 1 else np.empty((0, len(rolling.symbols)))
+        rolling._buffer[:len(returns)] = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+        rolling.count = len(returns)
+        rolling._position = len(returns) % window
+        rolling._resync()
+        return rolling
+
+    def _resync(self):
+        rows = self._buffer[:self.count] if self.count < self.window else self._buffer
+        self._sum = rows.sum(axis=0)
+        self._cross = rows.T @ rows
+
+    def update(self, returns):
+        """
+        Adds one bar of returns (array in symbol order or {symbol: return}).
+        """
+        if isinstance(returns, dict):
+            row = np.zeros(len(self.symbols))
+            for symbol, value in returns.items():
+                if symbol in self._column:
+                    row[self._column[symbol]] = value
+        else:
+            row = np.asarray(returns, dtype=np.float64)
+        row = np.nan_to_num(row, nan=0.0, posinf=0.0, neginf=0.0)
+
+        if self.count == self.window:
+            old = self._buffer[self._position]
+            self._sum -= old
+            self._cross -= np.outer(old, old)
+        else:
+            self.count += 1
+        self._buffer[self._position] = row
+        self._sum += row
+        self._cross += np.outer(row, row)
+        self._position = (self._position + 1) % self.window
+
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._resync()
+
+    def update_prices(self, previous_close, close):
+        """
+        Adds one bar from the previous and current closing prices (arrays in symbol order).
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.update(np.log(np.asarray(close, dtype=np.float64) / np.asarray(previous_close, dtype=np.float64)))
+
+    def set_open_prices(self, close):
+        """
+        Sets the current prices of the session in progress (array in symbol order or {symbol: price}).
+        They replace the previous ones instead of adding a bar; None removes the open session.
+        """
+        if close is None or self.last_close is None:
+            self._open_row = None
+            return
+        if isinstance(close, dict):
+            close = np.array([close.get(symbol) or np.nan for symbol in self.symbols], dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            row = np.log(np.asarray(close, dtype=np.float64) / self.last_close)
+        self._open_row = np.nan_to_num(row, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def append_bars(self, close):
+        """
+        Adds the completed bars of a dates x symbols close DataFrame that are newer than the last bar seen.
+        """
+        self._open_row = None
+        close = close.reindex(columns=self.symbols)
+        if self.last_date is not None:
+            close = close[close.index > self.last_date]
+        for date, row in zip(close.index, close.to_numpy(dtype=np.float64)):
+            if self.last_close is not None:
+                row = np.where(np.isfinite(row), row, self.last_close)
+                self.update_prices(self.last_close, row)
+            self.last_date, self.last_close = date, row
+
+    def covariance(self, annualize=True):
+        """
+        Returns the sample covariance matrix of the window (annualized by default).
+        """
+        total, cross, count = self._sum, self._cross, self.count
+        if self._open_row is not None:
+            # The open session takes the place of the oldest row without touching the running sums
+            row = self._open_row
+            total, cross = total + row, cross + np.outer(row, row)
+            if count == self.window:
+                old = self._buffer[self._position]
+                total, cross = total - old, cross - np.outer(old, old)
+            else:
+                count += 1
+        if count < 2:
+            return np.full((len(self.symbols),) * 2, np.nan)
+        cov = (cross - np.outer(total, total) / count) / (count - 1)
+        return cov * TRADING_DAYS_PER_YEAR if annualize else cov
+
+    def volatility(self):
+        """
+        Returns the annualized volatility of every symbol.
+        """
+        return np.sqrt(np.clip(np.diag(self.covariance()), 0, None))
+
+    def correlation(self):
+        """
+        Returns the correlation matrix of the window.
+        """
+        cov = self.covariance(annualize=False)
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+    def correlation_frame(self):
+        return pd.DataFrame(self.correlation(), index=self.symbols, columns=self.symbols)
+
+def open_positions(trades, today=None):
+    """
+    Nets the trade log rows into open option positions {(symbol, expiry, strike, type): contracts}.
+    Sold contracts are negative; expired positions are left out.
+    """
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    positions = {}
+    for trade in trades:
+        try:
+            action, quantity, symbol, expiry, strike, option_type = trade[2], int(trade[3]), trade[4], trade[5], float(trade[6]), trade[7]
+        except (IndexError, ValueError):
+            continue
+        if expiry < today:
+            continue
+        key = (symbol, expiry, strike, option_type)
+        positions[key] = positions.get(key, 0) + (quantity if action == "BOUGHT" else -quantity)
+    return {key: contracts for key, contracts in positions.items() if contracts != 0}
+
+def dollar_deltas(positions, prices, volatility, today=None):
+    """
+    Returns the dollar delta per symbol of the option positions (Black-Scholes delta with the
+    symbol's realized volatility). Short puts give a positive (long) exposure.
+    """
+    today = pd.Timestamp(today or datetime.now().date())
+    exposure = {}
+    for (symbol, expiry, strike, option_type), contracts in positions.items():
+        price, sigma = prices.get(symbol), volatility.get(symbol)
+        if not price or not sigma or not np.isfinite(sigma):
+            continue
+        years = max((pd.Timestamp(expiry) - today).days, 1) / 365
+        d1 = (np.log(price / strike) + 0.5 * sigma ** 2 * years) / (sigma * np.sqrt(years))
+        delta = ndtr(d1) - (1.0 if option_type == "PUT" else 0.0)
+        exposure[symbol] = exposure.get(symbol, 0.0) + float(contracts * CONTRACT_SIZE * price * delta)
+    return exposure
+
+def concentration_risk(exposure, rolling):
+    """
+    Compares the correlation-adjusted risk sqrt(e' Cov e) of the dollar exposures with the sum of their
+    standalone risks. Returns a dict with both figures, the diversification ratio and a per-symbol
+    breakdown including each symbol's share of the portfolio risk.
+    """
+    columns = [rolling.symbols.index(symbol) for symbol in exposure if symbol in rolling.symbols]
+    symbols = [rolling.symbols[column] for column in columns]
+    e = np.array([exposure[symbol] for symbol in symbols])
+    cov = rolling.covariance()[np.ix_(columns, columns)] if columns else np.empty((0, 0))
+    cov = np.nan_to_num(cov)
+
+    standalone = np.abs(e) * np.sqrt(np.clip(np.diag(cov), 0, None))
+    portfolio = float(np.sqrt(max(e @ cov @ e, 0.0))) if len(e) else 0.0
+    contribution = e * (cov @ e) / portfolio if portfolio > 0 else np.zeros(len(e))
+
+    breakdown = pd.DataFrame({
+        "Symbol": symbols,
+        "Dollar Delta": e,
+        "Standalone Risk": standalone,
+        "Risk Share": contribution / portfolio if portfolio > 0 else contribution,
+    }).sort_values("Risk Share", ascending=False, ignore_index=True)
+    total_standalone = float(standalone.sum())
+    return {
+        "portfolio_risk": portfolio,
+        "standalone_risk": total_standalone,
+        "diversification_ratio": portfolio / total_standalone if total_standalone > 0 else float("nan"),
+        "breakdown": breakdown,
+    }
+
+if __name__ == "__main__":
+    import yfinance as yf
+    from observer_options import load_all_trades
+
+    parser = argparse.ArgumentParser(description="Show the correlation and concentration risk of the open puts")
+    parser.add_argument("--window", type=int, default=63, help="rolling window in trading days")
+    args = parser.parse_args()
+
+    positions = open_positions(load_all_trades())
+    symbols = sorted({key[0] for key in positions}) or ["IWM", "SPY", "QQQ", "KWEB", "ARKK"]
+    close = yf.download(symbols, period="1y", interval="1d", progress=False)["Close"].reindex(columns=symbols)
+    rolling = RollingCovariance.from_closes(completed_bars(close), symbols, args.window)
+    if session_open():
+        rolling.set_open_prices(close.ffill().iloc[-1].to_numpy())
+
+    print(f"Correlation ({args.window} days):")
+    print(rolling.correlation_frame().round(2).to_string())
+    prices = dict(zip(symbols, close.ffill().iloc[-1]))
+    exposure = dollar_deltas(positions, prices, dict(zip(symbols, rolling.volatility())))
+    risk = concentration_risk(exposure, rolling)
+    print(f"\nAnnualized risk of the open positions: ${risk['portfolio_risk']:,.0f} correlated vs "
+          f"${risk['standalone_risk']:,.0f} standalone (ratio {risk['diversification_ratio']:.2f})")
+    print(risk["breakdown"].to_string(index=False))
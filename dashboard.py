@@ -0,0 +1,246 @@
+import os
+import csv
+import glob
+import html
+import json
+import hashlib
+from datetime import datetime
+from PIL import Image
+from results_store import DEFAULT_PATH as DEFAULT_RESULTS_DB, ResultsStore
+
+############################################################################################################
+# Results and Trades Dashboard
+#
+# Builds one browsable dashboard from all stored analysis runs and monthly trade logs. Every page is
+# tied to a hash of its inputs in a manifest, so only pages whose inputs changed are rewritten.
+# Charts are embedded as small JPEG thumbnails that link to the full-size image.
+############################################################################################################
+
+DASHBOARD_FOLDER = os.path.join("results", "dashboard")
+THUMBNAIL_SIZE = (480, 360)
+
+STYLE = """
+        body { font-family: Arial, sans-serif; margin: 20px; background-color: #f4f4f9; color: #333; }
+        h1 { color: #007bff; }
+        table { border-collapse: collapse; width: 100%; margin-top: 20px; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        th { background-color: #007bff; color: white; }
+        tr:nth-child(even) { background-color: #f9f9f9; }
+        img.thumb { width: 240px; height: auto; }
+        img.chart { display: block; margin: 20px auto; max-width: 100%; height: auto; }
+        .positive { color: green; font-weight: bold; }
+        .negative { color: red; font-weight: bold; }
+"""
+
+
+def _digest(value):
+    """
+    Returns a short hash of a JSON-serializable value.
+    """
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def _page(title, body):
+    """
+    Wraps a page body in the common HTML skeleton.
+    """
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(title)}</title>
+    <style>{STYLE}    </style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+def _profit_cell(value):
+    if value is None:
+        return "<td>N/A</td>"
+    css = "positive" if value >= 0 else "negative"
+    return f'<td class="{css}">${value:.2f}</td>'
+
+def make_thumbnail(image_path, thumbnail_path, size=THUMBNAIL_SIZE):
+    """
+    Writes a compressed JPEG thumbnail of an image unless it already exists.
+    """
+    if os.path.exists(thumbnail_path):
+        return thumbnail_path
+    os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+    with Image.open(image_path) as image:
+        image = image.convert("RGB")
+        image.thumbnail(size)
+        image.save(thumbnail_path, "JPEG", quality=70, optimize=True)
+    return thumbnail_path
+
+def _run_page_name(run):
+    return f"run_{run['symbol']}_{run['key'][:12]}.html"
+
+def run_page_path(run, folder=DASHBOARD_FOLDER):
+    """
+    Returns the path of a run's page, the HTML report of the run.
+    """
+    return os.path.join(folder, _run_page_name(run))
+
+def _trade_page_name(month):
+    return f"trades_{month}.html"
+
+def _render_run(run, folder):
+    """
+    Renders the detail page of one analysis run.
+    """
+    plot = run["artefacts"].get("plot")
+    chart = ""
+    if plot and os.path.exists(plot):
+        thumbnail = make_thumbnail(plot, os.path.join(folder, "thumbs", f"{run['key'][:12]}.jpg"))
+        chart = (
+            f'<a href="{html.escape(os.path.relpath(plot, folder))}">'
+            f'<img class="chart" src="{html.escape(os.path.relpath(thumbnail, folder))}" alt="Chart (click for full size)"></a>'
+        )
+
+    parameters = "".join(
+        f"<tr><th>{html.escape(str(name))}</th><td>{html.escape(str(value))}</td></tr>"
+        for name, value in sorted(run["parameters"].items())
+    )
+    body = f"""
+    <p><a href="index.html">&larr; Dashboard</a></p>
+    <h1>{html.escape(run['symbol'])} - {html.escape(run['created_at'])}</h1>
+    <h3>Recommendation</h3>
+    <pre>{html.escape(run['recommendation'] or '')}</pre>
+    <h3>Backtest Results</h3>
+    <table>
+        <tr><th>Total Profit</th>{_profit_cell(run['total_profit'])}</tr>
+        <tr><th>Average Profit</th>{_profit_cell(run['avg_profit'])}</tr>
+    </table>
+    <h3>Parameters</h3>
+    <table>{parameters}</table>
+    <h3>Chart</h3>
+    {chart}
+"""
+    return _page(f"ETF Analysis Results - {run['symbol']}", body)
+
+def _render_trades(month, headers, rows):
+    """
+    Renders the trade log page of one month.
+    """
+    header_cells = "".join(f"<th>{html.escape(column)}</th>" for column in headers)
+    body_rows = "\n".join("<tr>" + "".join(f"<td>{html.escape(value)}</td>" for value in row) + "</tr>" for row in rows)
+    body = f"""
+    <p><a href="index.html">&larr; Dashboard</a></p>
+    <h1>Trade Log for {html.escape(month)}</h1>
+    <table>
+        <thead><tr>{header_cells}</tr></thead>
+        <tbody>
+{body_rows}
+        </tbody>
+    </table>
+"""
+    return _page(f"Trade Log - {month}", body)
+
+def _render_index(runs, trade_months, folder):
+    """
+    Renders the overview page with all runs and trade logs.
+    """
+    run_rows = []
+    for run in runs:
+        thumbnail = os.path.join(folder, "thumbs", f"{run['key'][:12]}.jpg")
+        image = (
+            f'<img class="thumb" loading="lazy" src="{html.escape(os.path.relpath(thumbnail, folder))}" alt="">'
+            if os.path.exists(thumbnail) else ""
+        )
+        strike_price = f"${run['strike_price']:.2f}" if run["strike_price"] is not None else "N/A"
+        run_rows.append(
+            f"<tr><td><a href=\"{_run_page_name(run)}\">{html.escape(run['created_at'])}</a></td>"
+            f"<td>{html.escape(run['symbol'])}</td><td>{strike_price}</td><td>{run['dte']}</td>"
+            f"{_profit_cell(run['total_profit'])}{_profit_cell(run['avg_profit'])}"
+            f"<td>{html.escape(run['entry_rule'] or '')}</td><td>{image}</td></tr>"
+        )
+
+    trade_rows = "\n".join(
+        f'<tr><td><a href="{_trade_page_name(month)}">{month}</a></td><td>{count}</td></tr>'
+        for month, count in trade_months
+    )
+    body = f"""
+    <h1>Option Selling Dashboard</h1>
+    <p>Updated {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+    <h2>Analysis Runs</h2>
+    <table>
+        <thead><tr><th>Date</th><th>ETF</th><th>Strike</th><th>DTE</th><th>Total Profit</th><th>Average Profit</th><th>Entry Rule</th><th>Chart</th></tr></thead>
+        <tbody>
+{chr(10).join(run_rows)}
+        </tbody>
+    </table>
+    <h2>Trade Logs</h2>
+    <table>
+        <thead><tr><th>Month</th><th>Trades</th></tr></thead>
+        <tbody>
+{trade_rows}
+        </tbody>
+    </table>
+"""
+    return _page("Option Selling Dashboard", body)
+
+def _load_trade_logs(trades_folder):
+    """
+    Reads all monthly trade logs as {month: (file hash, headers, rows)}.
+    """
+    logs = {}
+    for log_file in sorted(glob.glob(os.path.join(trades_folder, "option_log_*.csv"))):
+        month = os.path.basename(log_file)[len("option_log_"):-len(".csv")]
+        with open(log_file, "rb") as file:
+            content = file.read()
+        rows = list(csv.reader(content.decode("utf-8").splitlines()))
+        logs[month] = (hashlib.sha1(content).hexdigest(), rows[0] if rows else [], rows[1:])
+    return logs
+
+def build_dashboard(results_db=DEFAULT_RESULTS_DB, trades_folder="trades", folder=DASHBOARD_FOLDER):
+    """
+    Updates the dashboard and returns the number of pages that were (re)written.
+    """
+    os.makedirs(folder, exist_ok=True)
+    manifest_file = os.path.join(folder, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_file):
+        with open(manifest_file) as file:
+            manifest = json.load(file)
+
+    written = 0
+
+    def write_page(name, input_hash, render):
+        nonlocal written
+        path = os.path.join(folder, name)
+        if manifest.get(name) == input_hash and os.path.exists(path):
+            return
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(render())
+        manifest[name] = input_hash
+        written += 1
+
+    runs = []
+    if os.path.exists(results_db):
+        store = ResultsStore(results_db)
+        runs = store.runs()
+        store.close()
+    for run in runs:
+        write_page(_run_page_name(run), _digest(run), lambda run=run: _render_run(run, folder))
+
+    trade_logs = _load_trade_logs(trades_folder)
+    for month, (file_hash, headers, rows) in trade_logs.items():
+        write_page(_trade_page_name(month), file_hash, lambda month=month, headers=headers, rows=rows: _render_trades(month, headers, rows))
+
+    trade_months = [(month, len(rows)) for month, (_, _, rows) in sorted(trade_logs.items(), reverse=True)]
+    index_inputs = [[run["key"], os.path.exists(os.path.join(folder, "thumbs", f"{run['key'][:12]}.jpg"))] for run in runs]
+    write_page("index.html", _digest([index_inputs, [[month, trade_logs[month][0]] for month, _ in trade_months]]),
+               lambda: _render_index(runs, trade_months, folder))
+
+    with open(manifest_file, "w") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+
+    print(f"Dashboard updated: {os.path.join(folder, 'index.html')} ({written} pages written)")
+    return written
+
+if __name__ == "__main__":
+    build_dashboard()
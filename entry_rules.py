@@ -0,0 +1,209 @@
+import ast
+import hashlib
+import operator
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+import vector_indicators as vi
+
+############################################################################################################
+# Entry-Rule Engine
+#
+# Entry rules are written as expressions over indicator fields, e.g.
+#     "rsi < 35 and close > ma_200 and close < bb_lower"
+# They are parsed once into a tree of NumPy operations and evaluated to a boolean mask over the bars.
+# Comparison masks are cached per data set, so searching thousands of rule combinations only pays for
+# each distinct condition once; backtest results are cached per (symbol, data hash, indicator windows,
+# rule, parameters) across searches, keeping the most recently used RESULT_CACHE_SIZE entries.
+############################################################################################################
+
+FIELDS = ("close", "rsi", "bb_mean", "bb_upper", "bb_lower", "ma_200")
+
+_COMPARISONS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+_ARITHMETIC = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+# Backtest results keyed by (symbol, data hash, indicator windows, rule, strike price, dte), oldest first
+RESULT_CACHE_SIZE = 10000
+_result_cache = OrderedDict()
+
+
+def indicator_fields(close, moving_average_200=None, rsi_window=14, bollinger_window=20):
+    """
+    Builds the indicator arrays that entry rules can refer to.
+    """
+    close = np.asarray(close, dtype=np.float64).ravel()
+    bb_mean, bb_upper, bb_lower = vi.bollinger_bands(close, bollinger_window)
+    if moving_average_200 is None:
+        moving_average_200 = vi.rolling_mean(close, 200)
+
+    return {
+        "close": close,
+        "rsi": vi.rsi(close, rsi_window),
+        "bb_mean": bb_mean,
+        "bb_upper": bb_upper,
+        "bb_lower": bb_lower,
+        "ma_200": np.asarray(moving_average_200, dtype=np.float64).ravel(),
+    }
+
+def data_hash(close):
+    """
+    Returns a short content hash of the price data.
+    """
+    return hashlib.blake2b(np.ascontiguousarray(close, dtype=np.float64).tobytes(), digest_size=16).hexdigest()
+
+def _is_condition(node):
+    """
+    Returns True for nodes that evaluate to a boolean mask: comparisons and and/or/not over conditions.
+    """
+    if isinstance(node, ast.Compare):
+        return True
+    if isinstance(node, ast.BoolOp):
+        return all(_is_condition(value) for value in node.values)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return _is_condition(node.operand)
+    return False
+
+def _compile_node(node, text):
+    """
+    Turns a parsed expression node into a function of (fields, mask cache).
+    """
+    if isinstance(node, ast.BoolOp):
+        if not all(_is_condition(value) for value in node.values):
+            raise ValueError(f"Operands of 'and'/'or' must be comparisons in entry rule: {text}")
+        children = [_compile_node(value, text) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+        def evaluate(fields, cache):
+            result = children[0](fields, cache)
+            for child in children[1:]:
+                result = combine(result, child(fields, cache))
+            return result
+        return evaluate
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        if not _is_condition(node.operand):
+            raise ValueError(f"Operand of 'not' must be a comparison in entry rule: {text}")
+        operand = _compile_node(node.operand, text)
+        return lambda fields, cache: np.logical_not(operand(fields, cache))
+
+    if isinstance(node, ast.Compare):
+        operands = [_compile_node(value, text) for value in [node.left] + node.comparators]
+        comparisons = []
+        for op in node.ops:
+            if type(op) not in _COMPARISONS:
+                raise ValueError(f"Unsupported comparison in entry rule: {text}")
+            comparisons.append(_COMPARISONS[type(op)])
+        key = ast.dump(node)
+
+        def evaluate(fields, cache):
+            if key not in cache:
+                values = [operand(fields, cache) for operand in operands]
+                with np.errstate(invalid='ignore'):
+                    result = comparisons[0](values[0], values[1])
+                    for i, compare in enumerate(comparisons[1:], start=1):
+                        result = np.logical_and(result, compare(values[i], values[i + 1]))
+                cache[key] = result
+            return cache[key]
+        return evaluate
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+        left = _compile_node(node.left, text)
+        right = _compile_node(node.right, text)
+        apply = _ARITHMETIC[type(node.op)]
+        return lambda fields, cache: apply(left(fields, cache), right(fields, cache))
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        operand = _compile_node(node.operand, text)
+        return lambda fields, cache: -operand(fields, cache)
+
+    if isinstance(node, ast.Name):
+        name = node.id.lower()
+        if name not in FIELDS:
+            raise ValueError(f"Unknown field '{node.id}' in entry rule: {text}. Available: {', '.join(FIELDS)}")
+        return lambda fields, cache: fields[name]
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = float(node.value)
+        return lambda fields, cache: value
+
+    raise ValueError(f"Unsupported expression in entry rule: {text}")
+
+@lru_cache(maxsize=None)
+def compile_rule(text):
+    """
+    Compiles an entry rule into a function that returns a boolean mask for a dict of indicator fields.
+    """
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid entry rule: {text}") from e
+    if not _is_condition(tree.body):
+        raise ValueError(f"Entry rule must be a comparison (e.g. rsi < 35): {text}")
+    evaluate = _compile_node(tree.body, text)
+
+    def rule(fields, cache=None):
+        mask = evaluate(fields, {} if cache is None else cache)
+        return np.broadcast_to(mask, fields["close"].shape)
+    return rule
+
+class RuleEvaluator:
+    """
+    Evaluates many entry rules over the same indicator fields, sharing condition masks between rules.
+    The windows must be the ones the fields were built with (see `indicator_fields`).
+    """
+
+    def __init__(self, symbol, fields, rsi_window=14, bollinger_window=20):
+        self.symbol = symbol
+        self.fields = fields
+        self.windows = (rsi_window, bollinger_window)
+        # The 200-day average may come from a longer history than the closes, so it is hashed as well
+        self.data_hash = data_hash(np.concatenate((fields["close"], fields["ma_200"])))
+        self._cache = {}
+
+    def mask(self, rule):
+        """
+        Returns the entry mask for a rule.
+        """
+        return compile_rule(rule)(self.fields, self._cache)
+
+    def backtest(self, rule, profits, strike_price, dte):
+        """
+        Returns (trades, total profit, average profit) for the entries selected by the rule.
+        `profits` holds the profit of a put sold at each bar (see `put_option_profits`).
+        """
+        key = (self.symbol, self.data_hash, self.windows, rule, float(strike_price), dte)
+        if key in _result_cache:
+            _result_cache.move_to_end(key)
+            return _result_cache[key]
+
+        selected = profits[self.mask(rule)[:len(profits)]]
+        total_profit = float(selected.sum())
+        _result_cache[key] = (len(selected), total_profit, total_profit / len(selected) if len(selected) else 0)
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+        return _result_cache[key]
+
+def search_rules(symbol, fields, rules, profits, strike_price, dte, rsi_window=14, bollinger_window=20):
+    """
+    Backtests every rule and returns a table sorted by total profit.
+    """
+    evaluator = RuleEvaluator(symbol, fields, rsi_window, bollinger_window)
+    rows = []
+    for rule in rules:
+        trades, total_profit, avg_profit = evaluator.backtest(rule, profits, strike_price, dte)
+        rows.append({"Rule": rule, "Trades": trades, "Total Profit": total_profit, "Average Profit": avg_profit})
+    return pd.DataFrame(rows).sort_values("Total Profit", ascending=False, ignore_index=True)
@@ -0,0 +1,254 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+import yfinance as yf
+import vector_indicators as vi
+
+############################################################################################################
+# Intraday-Resolution Indicators and Put Backtest
+#
+# Bars are stored per symbol and interval as flat columnar files (int64 timestamps and volume, float32
+# prices) that can be appended to and memory-mapped. Indicators and the backtest walk over the bars in
+# bounded chunks, so years of minute bars for many ETFs never have to be held in memory at once.
+# Indicator windows are given in trading days and converted to bars; DTE is measured in calendar time.
+############################################################################################################
+
+# Bar length in minutes for the supported intervals
+INTERVAL_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "1h": 60, "90m": 90, "1d": None}
+
+# Longest history Yahoo Finance returns per request for each interval
+MAX_PERIOD = {"1m": "7d", "2m": "60d", "5m": "60d", "15m": "60d", "30m": "60d", "60m": "730d", "1h": "730d", "90m": "60d", "1d": "max"}
+
+TRADING_MINUTES_PER_DAY = 390
+NANOSECONDS_PER_DAY = 86_400 * 10**9
+
+BAR_COLUMNS = {
+    "ts": np.int64,
+    "open": np.float32,
+    "high": np.float32,
+    "low": np.float32,
+    "close": np.float32,
+    "volume": np.int64,
+}
+
+INDICATOR_COLUMNS = ("rsi", "bb_mean", "bb_upper", "bb_lower", "ma_200")
+
+
+def bars_per_day(interval):
+    """
+    Returns the number of bars in one regular trading session for the interval.
+    """
+    if interval not in INTERVAL_MINUTES:
+        raise ValueError(f"Unsupported interval: {interval}")
+    minutes = INTERVAL_MINUTES[interval]
+    if minutes is None:
+        return 1
+    return int(np.ceil(TRADING_MINUTES_PER_DAY / minutes))
+
+def bars_for_days(days, interval):
+    """
+    Converts a window given in trading days into a number of bars.
+    """
+    return max(int(days * bars_per_day(interval)), 1)
+
+class BarStore:
+    """
+    Append-only columnar bar storage, one folder per symbol and interval.
+    """
+
+    def __init__(self, folder="bars"):
+        self.folder = folder
+
+    def path(self, symbol, interval):
+        safe_symbol = symbol.replace(" ", "_").replace("/", "_")
+        return os.path.join(self.folder, f"{safe_symbol}_{interval}")
+
+    def column_file(self, symbol, interval, name):
+        return os.path.join(self.path(symbol, interval), f"{name}.bin")
+
+    def length(self, symbol, interval):
+        """
+        Returns the number of stored bars.
+        """
+        ts_file = self.column_file(symbol, interval, "ts")
+        if not os.path.exists(ts_file):
+            return 0
+        return os.path.getsize(ts_file) // np.dtype(np.int64).itemsize
+
+    def column(self, symbol, interval, name, dtype=None):
+        """
+        Memory-maps a stored column read-only.
+        """
+        dtype = dtype or BAR_COLUMNS.get(name, np.float32)
+        filename = self.column_file(symbol, interval, name)
+        if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(filename, dtype=dtype, mode="r")
+
+    def append(self, symbol, interval, data):
+        """
+        Appends downloaded bars, skipping bars that are not newer than the last stored one.
+        Returns the number of appended bars.
+        """
+        if isinstance(data.columns, pd.MultiIndex):
+            data = data.xs(symbol, axis=1, level=-1) if symbol in data.columns.get_level_values(-1) else data.droplevel(-1, axis=1)
+        data = data.dropna(subset=["Close"])
+        if data.empty:
+            return 0
+
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        ts = index.as_unit("ns").asi8
+
+        stored = self.length(symbol, interval)
+        if stored:
+            last_ts = self.column(symbol, interval, "ts")[-1]
+            keep = ts > last_ts
+            ts = ts[keep]
+            data = data[keep]
+        if len(ts) == 0:
+            return 0
+
+        os.makedirs(self.path(symbol, interval), exist_ok=True)
+        columns = {
+            "ts": ts,
+            "open": data["Open"].to_numpy(),
+            "high": data["High"].to_numpy(),
+            "low": data["Low"].to_numpy(),
+            "close": data["Close"].to_numpy(),
+            "volume": np.nan_to_num(data["Volume"].to_numpy()) if "Volume" in data else np.zeros(len(ts)),
+        }
+        for name, dtype in BAR_COLUMNS.items():
+            with open(self.column_file(symbol, interval, name), "ab") as file:
+                np.ascontiguousarray(columns[name], dtype=dtype).tofile(file)
+        return len(ts)
+
+    def iter_chunks(self, symbol, interval, columns, chunk_bars=500_000, overlap=0):
+        """
+        Yields (start, arrays) for consecutive chunks of at most `chunk_bars` bars. Each chunk is
+        extended backwards by `overlap` bars so rolling windows are complete at the chunk start;
+        `start` is the position of the first non-overlap bar within the returned arrays.
+        """
+        length = self.length(symbol, interval)
+        mapped = {name: self.column(symbol, interval, name) for name in columns}
+        for chunk_start in range(0, length, chunk_bars):
+            chunk_end = min(chunk_start + chunk_bars, length)
+            read_start = max(chunk_start - overlap, 0)
+            arrays = {name: np.array(values[read_start:chunk_end]) for name, values in mapped.items()}
+            yield chunk_start - read_start, arrays
+
+def download_bars(symbol, interval="1m", store=None, period=None):
+    """
+    Downloads bars from Yahoo Finance and appends them to the bar store.
+    Repeated calls extend the stored history beyond the per-request limit of intraday intervals.
+    """
+    store = store or BarStore()
+    data = yf.download(symbol, interval=interval, period=period or MAX_PERIOD[interval], progress=False)
+    if data is None or data.empty:
+        print(f"No {interval} data downloaded for {symbol}.")
+        return 0
+    appended = store.append(symbol, interval, data)
+    print(f"Stored {appended} new {interval} bars for {symbol} ({store.length(symbol, interval)} total).")
+    return appended
+
+def compute_indicators(symbol, interval, store=None, chunk_bars=500_000, rsi_days=14, bollinger_days=20, ma_days=200):
+    """
+    Computes RSI, Bollinger Bands and the long moving average chunk by chunk and stores them as
+    float32 columns next to the bars. Windows are given in trading days.
+    """
+    store = store or BarStore()
+    rsi_window = bars_for_days(rsi_days, interval)
+    bollinger_window = bars_for_days(bollinger_days, interval)
+    ma_window = bars_for_days(ma_days, interval)
+    overlap = max(rsi_window + 1, bollinger_window, ma_window)
+
+    files = {name: open(store.column_file(symbol, interval, name), "wb") for name in INDICATOR_COLUMNS}
+    try:
+        for start, arrays in store.iter_chunks(symbol, interval, ("close",), chunk_bars, overlap):
+            close = arrays["close"]
+            bb_mean, bb_upper, bb_lower = vi.bollinger_bands(close, bollinger_window)
+            results = {
+                "rsi": vi.rsi(close, rsi_window),
+                "bb_mean": bb_mean,
+                "bb_upper": bb_upper,
+                "bb_lower": bb_lower,
+                "ma_200": vi.rolling_mean(close, ma_window),
+            }
+            for name, values in results.items():
+                values[start:].astype(np.float32).tofile(files[name])
+    finally:
+        for file in files.values():
+            file.close()
+
+def backtest_strategy(symbol, interval, strike_price, dte_days=45, store=None, chunk_bars=500_000, premium_rate=0.02):
+    """
+    Backtests the put-option strategy on stored bars. A put is sold at every bar and settled at the
+    first bar at or after `dte_days` calendar days later; entries without a settlement bar are skipped.
+    """
+    store = store or BarStore()
+    ts = store.column(symbol, interval, "ts")
+    close = store.column(symbol, interval, "close")
+    horizon = int(dte_days * NANOSECONDS_PER_DAY)
+
+    total_profit = 0.0
+    trades = 0
+    for _, arrays in store.iter_chunks(symbol, interval, ("ts", "close"), chunk_bars):
+        exit_indices = np.searchsorted(ts, arrays["ts"] + horizon)
+        settled = exit_indices < len(ts)
+        if not settled.any():
+            break
+
+        start_prices = arrays["close"][settled].astype(np.float64)
+        end_prices = close[exit_indices[settled]].astype(np.float64)
+        profits = np.where(end_prices >= strike_price, start_prices * premium_rate, strike_price - end_prices)
+        total_profit += profits.sum()
+        trades += len(profits)
+
+    avg_profit = total_profit / trades if trades else 0
+    return total_profit, avg_profit
+
+def run_intraday_analysis(symbols, interval="1m", strike_pct=0.95, dte_days=45, store=None, chunk_bars=500_000, download=True):
+    """
+    Downloads bars, computes the indicators and backtests a put with a strike below the last close.
+    """
+    store = store or BarStore()
+    results = {}
+    for symbol in symbols:
+        if download:
+            download_bars(symbol, interval, store)
+        if store.length(symbol, interval) == 0:
+            continue
+
+        compute_indicators(symbol, interval, store, chunk_bars)
+        last_close = float(store.column(symbol, interval, "close")[-1])
+        strike_price = round(last_close * strike_pct, 2)
+        total_profit, avg_profit = backtest_strategy(symbol, interval, strike_price, dte_days, store, chunk_bars)
+
+        results[symbol] = {
+            "bars": store.length(symbol, interval),
+            "last_close": last_close,
+            "rsi": float(store.column(symbol, interval, "rsi")[-1]),
+            "strike_price": strike_price,
+            "dte_days": dte_days,
+            "total_profit": total_profit,
+            "avg_profit": avg_profit,
+        }
+        print(
+            f"{symbol} ({interval}, {results[symbol]['bars']} bars): Strike {strike_price:.2f} USD, "
+            f"Total Profit {total_profit:.2f} USD, Average Profit {avg_profit:.4f} USD"
+        )
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Intraday indicators and put backtest")
+    parser.add_argument("symbols", nargs="*", default=["IWM", "SPY", "QQQ", "KWEB", "ARKK"])
+    parser.add_argument("--interval", default="1m", choices=sorted(INTERVAL_MINUTES))
+    parser.add_argument("--dte", type=float, default=45, help="days to expiration in calendar days")
+    parser.add_argument("--strike-pct", type=float, default=0.95, help="strike as a fraction of the last close")
+    parser.add_argument("--chunk-bars", type=int, default=500_000)
+    parser.add_argument("--no-download", action="store_true", help="only use bars already stored")
+    args = parser.parse_args()
+
+    run_intraday_analysis(args.symbols, args.interval, args.strike_pct, args.dte, chunk_bars=args.chunk_bars, download=not args.no_download)
@@ -0,0 +1,310 @@
+import time
+import argparse
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from alerts import AlertEngine, WebhookSink
+from results_store import ResultsStore
+from intraday import BarStore, INTERVAL_MINUTES
+import observer_etf
+import observer_options
+
+############################################################################################################
+# Accelerated Market Replay for the Observers
+#
+# Feeds recorded or synthetic quotes into the observers' refresh path (indicator computation, table
+# rows, alerts and optionally the Tk tables) at a multiple of real time. A producer thread publishes
+# quotes to a board that keeps only the latest quote per symbol; the refresh loop consumes the board
+# on the observers' cadence (scaled by the speed). The report shows tick-to-row latency, quotes that
+# were superseded before a refresh picked them up and refreshes that were skipped because the
+# previous one overran.
+############################################################################################################
+
+
+class QuoteBoard:
+    """
+    Latest quote per symbol with its arrival time; newer quotes replace unconsumed ones.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._quotes = {}
+        self.received = 0
+        self.superseded = 0
+
+    def put(self, symbol, price, arrival, day=None):
+        with self._lock:
+            self.received += 1
+            if symbol in self._quotes:
+                self.superseded += 1
+            self._quotes[symbol] = (price, arrival, day)
+
+    def take(self):
+        with self._lock:
+            quotes, self._quotes = self._quotes, {}
+        return quotes
+
+def synthetic_history(symbols, days=252, seed=0):
+    """
+    Creates a daily OHLC history in yfinance layout ((Price, Ticker) columns) ending today.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=datetime.now().date(), periods=days)
+    start_prices = rng.uniform(20, 500, len(symbols))
+    close = start_prices * np.exp(np.cumsum(rng.normal(0.0003, 0.012, (days, len(symbols))), axis=0))
+    open_ = close * np.exp(rng.normal(0, 0.004, close.shape))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.004, close.shape)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.004, close.shape)))
+
+    columns = pd.MultiIndex.from_product([["Open", "High", "Low", "Close"], symbols], names=["Price", "Ticker"])
+    return pd.DataFrame(np.hstack([open_, high, low, close]), index=dates, columns=columns)
+
+def synthetic_ticks(symbols, start_prices, duration=3600, tick_interval=1.0, seed=0):
+    """
+    Yields (seconds since start, symbol, price, session date) for random-walk quotes of today's
+    session; every symbol ticks about once per `tick_interval` seconds at a random time within each interval.
+    """
+    rng = np.random.default_rng(seed)
+    prices = np.asarray(start_prices, dtype=np.float64).copy()
+    step_volatility = 0.15 * np.sqrt(tick_interval / (252 * 6.5 * 3600))
+    for step in range(int(duration / tick_interval)):
+        prices *= np.exp(rng.normal(0, step_volatility, len(prices)))
+        offsets = step * tick_interval + np.sort(rng.uniform(0, tick_interval, len(prices)))
+        for column, offset in zip(rng.permutation(len(prices)), offsets):
+            yield offset, symbols[column], prices[column], None
+
+def stored_bars(symbols, interval="1m", store=None):
+    """
+    Returns the stored bars of the symbols in time order with their exchange session date.
+    """
+    store = store or BarStore()
+    frames = []
+    for symbol in symbols:
+        columns = {name: np.asarray(store.column(symbol, interval, name)) for name in ("ts", "open", "high", "low", "close")}
+        frames.append(pd.DataFrame({**columns, "symbol": symbol}))
+    bars = pd.concat(frames, ignore_index=True).sort_values("ts", kind="stable", ignore_index=True)
+    timestamps = pd.to_datetime(bars["ts"], utc=True).dt.tz_convert("America/New_York")
+    bars["day"] = timestamps.dt.tz_localize(None).dt.normalize()
+    return bars
+
+def replay_days(bars, days=1):
+    """
+    Returns the dates of the last `days` sessions in the bars.
+    """
+    return np.sort(bars["day"].unique())[-days:]
+
+def recorded_history(bars, symbols, days=1):
+    """
+    Builds the daily OHLC history (yfinance layout) from the stored bars before the replayed sessions,
+    plus a row for the first replayed session that opens at its first bar.
+    """
+    first_day = replay_days(bars, days)[0]
+    daily = bars[bars["day"] < first_day].groupby(["day", "symbol"]).agg(
+        Open=("open", "first"), High=("high", "max"), Low=("low", "min"), Close=("close", "last")
+    )
+    history = daily.unstack("symbol").reindex(columns=pd.MultiIndex.from_product([["Open", "High", "Low", "Close"], symbols]))
+
+    opens = bars[bars["day"] == first_day].groupby("symbol")["open"].first().reindex(symbols)
+    if len(history):
+        opens = opens.fillna(history["Close"].ffill().iloc[-1])
+    first_row = pd.DataFrame([np.tile(opens.to_numpy(dtype=np.float64), 4)], index=[first_day], columns=history.columns)
+    history = pd.concat([history, first_row]).astype(np.float64)
+    history.columns.names = ["Price", "Ticker"]
+    return history
+
+def recorded_ticks(bars, interval="1m", days=1):
+    """
+    Yields (seconds since start, symbol, price, session date) from the closes of the last `days` stored
+    sessions. Gaps longer than one bar (overnight, weekends, holidays) are shortened to one bar.
+    """
+    bars = bars[bars["day"].isin(replay_days(bars, days))]
+    if bars.empty:
+        return
+    bar_seconds = (INTERVAL_MINUTES.get(interval) or 1440) * 60
+    gaps = np.diff(bars["ts"].to_numpy(), prepend=bars["ts"].iloc[0]) / 1e9
+    offsets = np.cumsum(np.minimum(gaps, bar_seconds))
+    for offset, symbol, price, day in zip(offsets, bars["symbol"].to_numpy(), bars["close"].to_numpy(np.float64), bars["day"]):
+        yield offset, symbol, price, day
+
+def synthetic_trades(symbols, prices, count, seed=0):
+    """
+    Creates short-put trade log rows spread over the symbols.
+    """
+    rng = np.random.default_rng(seed)
+    expiry = (datetime.now() + timedelta(days=45)).strftime("%Y-%m-%d")
+    trades = []
+    for i in range(count):
+        column = i % len(symbols)
+        strike = round(prices[column] * rng.uniform(0.9, 1.0), 2)
+        trades.append([datetime.now().strftime("%Y-%m-%d"), "10:00", "SOLD", "1", symbols[column], expiry, str(strike), "PUT", "1.00", "replay"])
+    return trades
+
+def _percentile_ms(values, q):
+    return float(np.percentile(values, q) * 1000) if len(values) else float("nan")
+
+def replay(symbols, ticks, history, speed=100.0, refresh_interval=30.0, trades=0, ui=False):
+    """
+    Replays the ticks through the observers' refresh path and returns the statistics.
+    """
+    board = QuoteBoard()
+    latest_prices = {}
+    iv_data = {symbol: 0.2 for symbol in symbols}
+    iv_store = ResultsStore(":memory:")
+    alert_sink = WebhookSink()
+    engine = AlertEngine([alert_sink], cooldown=300)
+    trade_rows = synthetic_trades(symbols, history["Close"].iloc[-1].to_numpy(), trades)
+
+    # Positions of today's Close/High/Low cells for every symbol
+    prices = history.copy()
+    close_positions = [prices.columns.get_loc(("Close", symbol)) for symbol in symbols]
+    high_positions = [prices.columns.get_loc(("High", symbol)) for symbol in symbols]
+    low_positions = [prices.columns.get_loc(("Low", symbol)) for symbol in symbols]
+
+    trees = None
+    if ui:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+        root.title(f"Market Replay ({speed:g}x)")
+        trees = []
+        for columns in (observer_etf.TABLE_COLUMNS, tuple(f"Column {i + 1}" for i in range(11))):
+            tree = ttk.Treeview(root, columns=columns, show="headings", height=12)
+            for col in columns:
+                tree.heading(col, text=col)
+                tree.column(col, width=110, anchor="center")
+            tree.pack(fill=tk.BOTH, expand=True)
+            trees.append(tree)
+
+    done = threading.Event()
+    producer_lag = []
+
+    def produce():
+        start = time.perf_counter()
+        for offset, symbol, price, day in ticks:
+            target = start + offset / speed
+            now = time.perf_counter()
+            if target - now > 0.001:
+                time.sleep(target - now)
+                now = time.perf_counter()
+            producer_lag.append(max(now - target, 0.0))
+            board.put(symbol, price, now, day)
+        done.set()
+
+    latencies = []
+    refresh_times = []
+    skipped_refreshes = 0
+    period = refresh_interval / speed
+
+    producer = threading.Thread(target=produce, daemon=True)
+    started = time.perf_counter()
+    producer.start()
+    next_refresh = started + period
+    while True:
+        finished = done.is_set()
+        now = time.perf_counter()
+        if now < next_refresh and not finished:
+            time.sleep(min(next_refresh - now, 0.05))
+            continue
+
+        quotes = board.take()
+        if not quotes and finished:
+            break
+
+        refresh_start = time.perf_counter()
+        for symbol, (price, _, _) in quotes.items():
+            latest_prices[symbol] = price
+
+        # A recorded quote of a later session starts a new daily row at the previous closes
+        days = [day for _, _, day in quotes.values() if day is not None]
+        if days and max(days) > prices.index[-1]:
+            previous_close = prices["Close"].iloc[-1].to_numpy()
+            new_row = pd.DataFrame([np.tile(previous_close, 4)], index=[max(days)], columns=prices.columns)
+            prices = pd.concat([prices, new_row])
+
+        if quotes:
+            columns = [symbols.index(symbol) for symbol in quotes]
+            new_close = np.array([quotes[symbols[column]][0] for column in columns])
+            row = prices.iloc[-1]
+            prices.iloc[-1, [close_positions[c] for c in columns]] = new_close
+            prices.iloc[-1, [high_positions[c] for c in columns]] = np.maximum(row.iloc[[high_positions[c] for c in columns]].to_numpy(), new_close)
+            prices.iloc[-1, [low_positions[c] for c in columns]] = np.minimum(row.iloc[[low_positions[c] for c in columns]].to_numpy(), new_close)
+
+        data = observer_etf.compute_etf_data(prices, symbols)
+        etf_rows = observer_etf.build_table_rows(data, iv_data, iv_store, engine)
+        observer_options.update_strike_alerts(trade_rows, latest_prices.get, engine)
+        option_rows = observer_options.build_trade_rows(trade_rows, latest_prices.get)
+
+        if trees:
+            for tree, rows in zip(trees, (etf_rows, option_rows)):
+                tree.delete(*tree.get_children())
+                for values, tags in rows:
+                    tree.insert("", "end", values=values, tags=tags)
+            root.update()
+
+        refresh_end = time.perf_counter()
+        refresh_times.append(refresh_end - refresh_start)
+        latencies.extend(refresh_end - arrival for _, arrival, _ in quotes.values())
+
+        # Refreshes whose slot passed while this one was running are skipped, like a blocked Tk loop
+        next_refresh += period
+        if refresh_end > next_refresh:
+            missed = int((refresh_end - next_refresh) // period) + 1
+            skipped_refreshes += missed
+            next_refresh += missed * period
+
+    if trees:
+        root.destroy()
+
+    return {
+        "symbols": len(symbols),
+        "trades": len(trade_rows),
+        "speed": speed,
+        "wall_seconds": time.perf_counter() - started,
+        "ticks": board.received,
+        "rows_updated": len(latencies),
+        "superseded_quotes": board.superseded,
+        "refreshes": len(refresh_times),
+        "skipped_refreshes": skipped_refreshes,
+        "latency_p50_ms": _percentile_ms(latencies, 50),
+        "latency_p95_ms": _percentile_ms(latencies, 95),
+        "latency_p99_ms": _percentile_ms(latencies, 99),
+        "latency_max_ms": max(latencies) * 1000 if latencies else float("nan"),
+        "refresh_mean_ms": float(np.mean(refresh_times) * 1000) if refresh_times else float("nan"),
+        "refresh_max_ms": max(refresh_times) * 1000 if refresh_times else float("nan"),
+        "producer_lag_max_ms": max(producer_lag) * 1000 if producer_lag else 0.0,
+        "alerts": len(alert_sink.sent),
+    }
+
+def print_report(stats):
+    """
+    Prints the replay statistics.
+    """
+    print("Replay results")
+    for name, value in stats.items():
+        print(f"  - {name.replace('_', ' ').capitalize()}: {value:.2f}" if isinstance(value, float) else f"  - {name.replace('_', ' ').capitalize()}: {value}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay quotes through the observers at accelerated speed")
+    parser.add_argument("symbols", nargs="*", help="symbols to replay (default: synthetic tickers)")
+    parser.add_argument("--count", type=int, default=50, help="number of synthetic symbols if none are given")
+    parser.add_argument("--speed", type=float, default=100, help="replay speed as a multiple of real time")
+    parser.add_argument("--duration", type=float, default=3600, help="market seconds of synthetic quotes")
+    parser.add_argument("--tick-interval", type=float, default=1.0, help="seconds between synthetic quotes per symbol")
+    parser.add_argument("--refresh", type=float, default=30, help="observer refresh interval in market seconds")
+    parser.add_argument("--trades", type=int, default=100, help="number of synthetic short puts")
+    parser.add_argument("--recorded", metavar="INTERVAL", help="replay stored intraday bars of this interval instead")
+    parser.add_argument("--days", type=int, default=1, help="number of stored sessions to replay with --recorded")
+    parser.add_argument("--ui", action="store_true", help="also update Tk tables")
+    args = parser.parse_args()
+
+    symbols = args.symbols or [f"SYN{i:03d}" for i in range(args.count)]
+    if args.recorded:
+        bars = stored_bars(symbols, args.recorded)
+        history = recorded_history(bars, symbols, args.days)
+        ticks = recorded_ticks(bars, args.recorded, args.days)
+    else:
+        history = synthetic_history(symbols)
+        ticks = synthetic_ticks(symbols, history["Close"].iloc[-1].to_numpy(), args.duration, args.tick_interval)
+
+    print_report(replay(symbols, ticks, history, args.speed, args.refresh, args.trades, args.ui))
@@ -4,6 +4,9 @@ import tkinter as tk
 from tkinter import ttk
 import numpy as np
 import time
+import vector_indicators as vi
+from results_store import ResultsStore
+from alerts import create_engine
 
 ############################################################################################################
 # Observe ETFs and their data
@@ -12,41 +15,146 @@ import time
 # Define the list of ETFs to track
 etfs = ["IWM", "SPY", "QQQ", "KWEB", "ARKK"]
 
-# Function to fetch daily price and implied volatility (IV) data
-def fetch_etf_data(symbol):
-    try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="1y", interval="1d")
-        hist.reset_index(inplace=True)
-        hist = hist[["Date", "Close"]]
-        hist.columns = ["Date", "Close Price"]
-
-        # Calculate 200-day moving average
-        hist["200-Day MA"] = hist["Close Price"].rolling(window=200).mean()
-
-        # Calculate RSI (Relative Strength Index)
-        delta = hist["Close Price"].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        hist["RSI"] = 100 - (100 / (1 + rs))
-
-        # Calculate Historical Volatility
-        hist["Log Returns"] = np.log(hist["Close Price"] / hist["Close Price"].shift(1))
-        hist["Hist Volatility"] = hist["Log Returns"].rolling(window=21).std() * np.sqrt(252)
-
-        # Fetch Current IV (if available)
-        try:
-            options = ticker.option_chain()
-            iv = options.calls["impliedVolatility"].mean() if not options.calls.empty else None
-        except Exception as opt_err:
-            print(f"Error fetching IV for {symbol}: {opt_err}")
-            iv = None
+TABLE_COLUMNS = ("ETF", "Date", "Close Price", "Change", "200-Day MA", "RSI", "Indicator", "IV", "Hist Volatility", "YZ Volatility", "IV/HV", "IV Rank")
+
+# Windows (in trading days) of the realized-volatility estimators
+VOLATILITY_WINDOWS = (10, 21, 63)
+
+# Created on first use so importing the module has no side effects
+store = None
+alert_engine = None
+
+def get_store():
+    global store
+    if store is None:
+        store = ResultsStore()
+    return store
 
-        return hist, iv
+def get_alert_engine():
+    global alert_engine
+    if alert_engine is None:
+        alert_engine = create_engine()
+    return alert_engine
+
+# Function to fetch the current implied volatility (IV) from the option chain
+def fetch_iv(symbol):
+    try:
+        options = yf.Ticker(symbol).option_chain()
+        return options.calls["impliedVolatility"].mean() if not options.calls.empty else None
+    except Exception as opt_err:
+        print(f"Error fetching IV for {symbol}: {opt_err}")
+        return None
+
+# Function to fetch daily OHLC data of all ETFs at once and compute the indicators in one pass
+def fetch_etf_universe(symbols):
+    try:
+        prices = yf.download(symbols, period="1y", interval="1d", progress=False)
+        # yfinance returns an empty frame instead of raising when the download fails
+        if prices is None or prices.empty:
+            print(f"No data received for {', '.join(symbols)}")
+            return {}
+        return compute_etf_data(prices, symbols)
     except Exception as e:
-        print(f"Error fetching data for {symbol}: {e}")
-        return None, None
+        print(f"Error fetching data for {', '.join(symbols)}: {e}")
+        return {}
+
+# Function to compute the indicators of all ETFs from a yfinance-style (Price, Ticker) OHLC frame
+def compute_etf_data(prices, symbols):
+    if prices.empty:
+        return {}
+    # dates x tickers matrices
+    ohlc = {}
+    for field in ("Open", "High", "Low", "Close"):
+        values = prices[field]
+        if isinstance(values, pd.Series):
+            values = values.to_frame(symbols[0])
+        ohlc[field] = values.reindex(columns=symbols).to_numpy(dtype=np.float64)
+    close = ohlc["Close"]
+    indicators = {
+        "200-Day MA": vi.rolling_mean(close, 200),
+        "RSI": vi.rsi(close, 14),
+    }
+    volatility = vi.realized_volatility(ohlc["Open"], ohlc["High"], ohlc["Low"], close, VOLATILITY_WINDOWS)
+    for (estimator, window), values in volatility.items():
+        indicators[f"HV {estimator} {window}d"] = values
+    # Close-to-close 21-day volatility keeps its original column name
+    indicators["Hist Volatility"] = volatility[("close", 21)]
+
+    dates = prices.index.tz_localize(None) if prices.index.tz is not None else prices.index
+    data = {}
+    for column, symbol in enumerate(symbols):
+        hist = pd.DataFrame({"Date": dates, "Close Price": close[:, column]})
+        for name, values in indicators.items():
+            hist[name] = values[:, column]
+        hist = hist.dropna(subset=["Close Price"]).reset_index(drop=True)
+        if not hist.empty:
+            data[symbol] = hist
+    return data
+
+def volatility_summary(etf, hist, iv, iv_store=None):
+    """
+    Returns the Yang-Zhang HV, the IV/HV ratio and the IV rank for the latest row.
+    """
+    iv_store = iv_store or get_store()
+    hist_vol = hist["HV yang_zhang 21d"].iloc[-1]
+    iv_hv_ratio = iv / hist_vol if iv and not pd.isna(hist_vol) and hist_vol > 0 else None
+    iv_rank = None
+    if iv:
+        iv_store.record_iv(etf, iv)
+        iv_rank = iv_store.iv_rank(etf, iv)
+    return hist_vol, iv_hv_ratio, iv_rank
+
+def build_table_rows(data, iv_data, iv_store=None, engine=None):
+    """
+    Builds the table rows as (values, tags) and feeds the latest values into the alert engine.
+    """
+    engine = engine or get_alert_engine()
+    rows = []
+    for etf, df in data.items():
+        iv = iv_data.get(etf)
+        if not df.empty:
+            today = df.iloc[-1]
+            yesterday = df.iloc[-2] if len(df) > 1 else None
+            change = today["Close Price"] - (yesterday["Close Price"] if yesterday is not None else 0)
+
+            indicator = "Neutral"
+            if today["RSI"] < 30:
+                indicator = "Oversold"
+            elif today["RSI"] > 70:
+                indicator = "Overbought"
+
+            tags = ("positive" if change >= 0 else "negative",)
+
+            # Ensure Hist Volatility is displayed as a percentage
+            hist_vol = f"{today['Hist Volatility']:.2%}" if not pd.isna(today["Hist Volatility"]) else "N/A"
+            yz_vol, iv_hv_ratio, iv_rank = volatility_summary(etf, df, iv, iv_store)
+
+            engine.on_tick(etf, {
+                "price": today["Close Price"],
+                "rsi": today["RSI"],
+                "iv": iv,
+                "hist_volatility": today["Hist Volatility"],
+                "yz_volatility": yz_vol,
+                "iv_hv": iv_hv_ratio,
+                "iv_rank": iv_rank,
+            })
+
+            values = (
+                etf,
+                today["Date"].strftime("%Y-%m-%d"),
+                f"${today['Close Price']:.2f}",
+                f"${change:.2f}",
+                f"${today['200-Day MA']:.2f}" if not pd.isna(today["200-Day MA"]) else "N/A",
+                f"{today['RSI']:.2f}" if not pd.isna(today["RSI"]) else "N/A",
+                indicator,
+                f"{iv:.2%}" if iv else "N/A",
+                hist_vol,
+                f"{yz_vol:.2%}" if not pd.isna(yz_vol) else "N/A",
+                f"{iv_hv_ratio:.2f}" if iv_hv_ratio else "N/A",
+                f"{iv_rank:.0%}" if iv_rank is not None else "N/A",
+            )
+            rows.append((values, tags))
+    return rows
 
 # Fetch data for all ETFs
 data = {}
@@ -54,20 +162,15 @@ iv_data = {}
 
 def refresh_data():
     global data, iv_data
-    data = {}
-    iv_data = {}
-    for etf in etfs:
-        print(f"Fetching data for {etf}...")
-        price_data, iv = fetch_etf_data(etf)
-        if price_data is not None:
-            data[etf] = price_data
-            iv_data[etf] = iv
+    print(f"Fetching data for {', '.join(etfs)}...")
+    data = fetch_etf_universe(etfs)
+    iv_data = {etf: fetch_iv(etf) for etf in data}
     print(f"Fetching data done - {time.strftime('%H:%M:%S')}")
 
 def show_data_table():
     root = tk.Tk()
     root.title("ETF Tracker")
-    root.geometry("1400x500+300+100")  # Adjusted size for additional column
+    root.geometry("1800x500+100+100")  # Adjusted size for additional columns
 
     # Create a custom style for the Treeview header
     style = ttk.Style(root)
@@ -78,13 +181,13 @@ def show_data_table():
         foreground="black",             # Text color
     )
 
-    columns = ("ETF", "Date", "Close Price", "Change", "200-Day MA", "RSI", "Indicator", "IV", "Hist Volatility")
+    columns = TABLE_COLUMNS
     tree = ttk.Treeview(root, columns=columns, show="headings")
 
     # Define column headers and sorting functionality
     for col in columns:
         tree.heading(col, text=col, command=lambda c=col: sort_column(tree, c, False))
-        tree.column(col, width=150, anchor="center")
+        tree.column(col, width=145, anchor="center")
 
     tree.pack(fill=tk.BOTH, expand=True)
 
@@ -104,40 +207,8 @@ def show_data_table():
         for row in tree.get_children():
             tree.delete(row)
 
-        for etf, df in data.items():
-            iv = iv_data[etf]
-            if not df.empty:
-                today = df.iloc[-1]
-                yesterday = df.iloc[-2] if len(df) > 1 else None
-                change = today["Close Price"] - (yesterday["Close Price"] if yesterday is not None else 0)
-
-                indicator = "Neutral"
-                if today["RSI"] < 30:
-                    indicator = "Oversold"
-                elif today["RSI"] > 70:
-                    indicator = "Overbought"
-
-                tags = ("positive" if change >= 0 else "negative",)
-
-                # Ensure Hist Volatility is displayed as a percentage
-                hist_vol = f"{today['Hist Volatility']:.2%}" if not pd.isna(today["Hist Volatility"]) else "N/A"
-
-                tree.insert(
-                    "",
-                    tk.END,
-                    values=(
-                        etf,
-                        today["Date"].strftime("%Y-%m-%d"),
-                        f"${today['Close Price']:.2f}",
-                        f"${change:.2f}",
-                        f"${today['200-Day MA']:.2f}" if not pd.isna(today["200-Day MA"]) else "N/A",
-                        f"{today['RSI']:.2f}" if not pd.isna(today["RSI"]) else "N/A",
-                        indicator,
-                        f"{iv:.2%}" if iv else "N/A",
-                        hist_vol
-                    ),
-                    tags=tags
-                )
+        for values, tags in build_table_rows(data, iv_data):
+            tree.insert("", tk.END, values=values, tags=tags)
 
         tree.tag_configure("positive", foreground="green")
         tree.tag_configure("negative", foreground="red")
@@ -152,5 +223,6 @@ def show_data_table():
     root.mainloop()
 
 # Run the application
-refresh_data()
-show_data_table()
+if __name__ == "__main__":
+    refresh_data()
+    show_data_table()
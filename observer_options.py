@@ -2,13 +2,32 @@ import tkinter as tk
 from tkinter import messagebox, ttk
 import csv
 import os
+import glob
 from datetime import datetime
 import yfinance as yf
+from alerts import create_engine, strike_rule
+from correlation_risk import RollingCovariance, open_positions, dollar_deltas, concentration_risk, completed_bars, last_completed_session, session_open
 
 ############################################################################################################
 # Observe Logged Trades with Current Price and Sortable Columns
 ############################################################################################################
 
+# Alert when the price comes within this distance of a short put's strike
+STRIKE_ALERT_PCT = 0.02
+
+# Created on first use so importing the module has no side effects
+alert_engine = None
+
+def get_alert_engine():
+    global alert_engine
+    if alert_engine is None:
+        alert_engine = create_engine()
+    return alert_engine
+
+# Rolling covariance of the traded underlyings, extended by new daily bars on refresh
+risk_model = None
+risk_model_checked = None
+
 def load_trade_log():
     """
     Loads the trade log from the CSV file for the current month.
@@ -33,6 +52,16 @@ def load_trade_log():
         else:
             return [], []
 
+def load_all_trades(folder="trades"):
+    """
+    Loads the trades of every monthly log, so positions opened in earlier months are included.
+    """
+    trades = []
+    for log_file in sorted(glob.glob(os.path.join(folder, "option_log_*.csv"))):
+        with open(log_file, mode="r") as file:
+            trades.extend(list(csv.reader(file))[1:])
+    return trades
+
 def get_current_price(symbol):
     """
     Fetches the current price of the symbol using yfinance.
@@ -60,21 +89,37 @@ def sort_column(tree, col, reverse):
 
     tree.heading(col, command=lambda: sort_column(tree, col, not reverse))
 
-def refresh_data(tree, headers):
+def update_strike_alerts(trades, price_lookup, engine=None):
     """
-    Refreshes the data in the table.
+    Keeps a strike alert for every open short put (netted over the trades), removes the alerts of closed
+    puts and feeds the current prices.
     """
-    # Clear the table
-    for row in tree.get_children():
-        tree.delete(row)
-
-    headers, trades = load_trade_log()
+    engine = engine or get_alert_engine()
+    short_puts = [key for key, contracts in open_positions(trades).items() if key[3] == "PUT" and contracts < 0]
+    rules = [strike_rule(symbol, strike_price, expiry, STRIKE_ALERT_PCT) for symbol, expiry, strike_price, _ in short_puts]
+
+    # Puts that were bought back or expired no longer get alerts
+    current = {rule.rule_id for rule in rules}
+    for rule_id in [rule_id for rule_id in engine.rules if rule_id.startswith("strike:") and rule_id not in current]:
+        engine.remove_rule(rule_id)
+    for rule in rules:
+        engine.add_rule(rule)
+    for symbol in sorted({key[0] for key in short_puts}):
+        current_price = price_lookup(symbol)
+        if current_price:
+            engine.on_tick(symbol, {"price": current_price})
+
+def build_trade_rows(trades, price_lookup):
+    """
+    Builds the table rows as (values, tags), looking up current prices with `price_lookup(symbol)`.
+    """
+    rows = []
     for trade in trades:
         symbol = trade[4]  # Assuming Symbol is the 5th column
         strike_price = float(trade[6])  # Assuming Strike Price is the 7th column
 
         # Fetch the current price
-        current_price = get_current_price(symbol)
+        current_price = price_lookup(symbol)
         current_price_display = f"${current_price:.2f}" if current_price else "N/A"
 
         # Check the condition and tag the row
@@ -83,8 +128,76 @@ def refresh_data(tree, headers):
         else:
             tags = ("below_strike",)
 
-        trade.append(current_price_display)  # Add new data to the row
-        tree.insert("", tk.END, values=trade, tags=tags)
+        rows.append((list(trade) + [current_price_display], tags))  # Add new data to the row
+    return rows
+
+def update_risk_model(symbols, prices):
+    """
+    Creates the rolling covariance for the symbols (one year of completed sessions) and appends a bar
+    once per closed session. While the market is open the current prices update the open session in
+    place, so refreshes between closes need no download.
+    """
+    global risk_model, risk_model_checked
+    try:
+        if risk_model is None or set(symbols) - set(risk_model.symbols):
+            close = yf.download(symbols, period="1y", interval="1d", progress=False)["Close"]
+            risk_model = RollingCovariance.from_closes(completed_bars(close), symbols)
+            risk_model_checked = last_completed_session()
+        elif risk_model_checked < last_completed_session():
+            # Checked once per session (a holiday simply yields no new bar)
+            risk_model_checked = last_completed_session()
+            risk_model.append_bars(completed_bars(yf.download(risk_model.symbols, period="5d", interval="1d", progress=False)["Close"]))
+    except Exception as e:
+        print(f"Error fetching closes for the correlation risk: {e}")
+    if risk_model is not None:
+        risk_model.set_open_prices(prices if session_open() else None)
+    return risk_model
+
+def concentration_summary(trades, price_lookup):
+    """
+    Returns a one-line summary of the correlation-adjusted risk of the open positions in the trades
+    (all monthly logs, see load_all_trades).
+    """
+    positions = open_positions(trades)
+    symbols = sorted({key[0] for key in positions})
+    if not symbols:
+        return "No open positions"
+    prices = {symbol: price_lookup(symbol) for symbol in symbols}
+    model = update_risk_model(symbols, prices)
+    if model is None:
+        return "Correlation risk: N/A"
+
+    volatility = dict(zip(model.symbols, model.volatility()))
+    risk = concentration_risk(dollar_deltas(positions, prices, volatility), model)
+    top = risk["breakdown"].iloc[0] if not risk["breakdown"].empty else None
+    return (
+        f"Annualized risk: ${risk['portfolio_risk']:,.0f} correlated vs ${risk['standalone_risk']:,.0f} standalone "
+        f"(ratio {risk['diversification_ratio']:.2f})"
+        + (f" - largest share: {top['Symbol']} {top['Risk Share']:.0%}" if top is not None else "")
+    )
+
+def refresh_data(tree, headers, risk_label=None):
+    """
+    Refreshes the data in the table.
+    """
+    # Clear the table
+    for row in tree.get_children():
+        tree.delete(row)
+
+    headers, trades = load_trade_log()
+    prices = {}
+    def price_lookup(symbol):
+        if symbol not in prices:
+            prices[symbol] = get_current_price(symbol)
+        return prices[symbol]
+
+    for values, tags in build_trade_rows(trades, price_lookup):
+        tree.insert("", tk.END, values=values, tags=tags)
+
+    all_trades = load_all_trades()
+    update_strike_alerts(all_trades, price_lookup)
+    if risk_label is not None:
+        risk_label.config(text=concentration_summary(all_trades, price_lookup))
 
     # Configure row colors
     tree.tag_configure("above_strike", background="lightgreen")
@@ -111,12 +224,15 @@ def display_trade_log():
 
     tree.pack(fill=tk.BOTH, expand=True)
 
+    risk_label = tk.Label(root, text="", font=("Helvetica", 11))
+    risk_label.pack(pady=5)
+
     # Initial data load
-    refresh_data(tree, headers)
+    refresh_data(tree, headers, risk_label)
 
     # Set up periodic refresh (every 30 seconds)
     def periodic_refresh():
-        refresh_data(tree, headers)
+        refresh_data(tree, headers, risk_label)
         print("Refreshed data - observed trades " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"))   
         root.after(30000, periodic_refresh)  # Schedule the next refresh in 30 seconds
 
@@ -4,13 +4,20 @@ from sklearn.linear_model import LinearRegression
 import yfinance as yf
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 from scipy.signal import argrelextrema
 import tkinter as tk
 from tkinter.scrolledtext import ScrolledText
-from tkinter import ttk
+from tkinter import ttk, messagebox
 import threading
 from yahoo_fin import options
+from chart_rendering import TrendChart
+from entry_rules import compile_rule, data_hash, indicator_fields
+from results_store import DEFAULT_PATH as DEFAULT_RESULTS_DB, ResultsStore, run_key
+from dashboard import build_dashboard, run_page_path
+from universe_scanner import load_universe
+from trade_management import simulate_management
+from price_series import PriceSeries, close_values
+import vector_indicators as vi
 
 ############################################################################################################
 # Option-Selling Strategy for ETFs
@@ -18,30 +25,23 @@ from yahoo_fin import options
 # ONLY FOR EDUCATIONAL PURPOSES
 ############################################################################################################
 
+# Resolution used when saving plot images
+PLOT_DPI = 150
+
 
 def detect_trends(data):
     """
     Identifies upward and downward trendlines based on highs and lows.
     """
-    close_prices = data['Close']
-    local_maxima_indices = argrelextrema(close_prices.values, np.greater, order=5)[0]
-    local_minima_indices = argrelextrema(close_prices.values, np.less, order=5)[0]
+    close_prices = close_values(data)
+    local_maxima_indices = argrelextrema(close_prices, np.greater, order=5)[0]
+    local_minima_indices = argrelextrema(close_prices, np.less, order=5)[0]
 
-    maxima_points = data.iloc[local_maxima_indices].reset_index()
-    minima_points = data.iloc[local_minima_indices].reset_index()
+    maxima_points = data.take(local_maxima_indices)
+    minima_points = data.take(local_minima_indices)
 
     return maxima_points, minima_points
 
-def clean_data(series):
-    """
-    Cleans the data to ensure it contains only numeric values.
-    """
-    if isinstance(series, pd.DataFrame):
-        series = series.squeeze()
-    elif isinstance(series, np.ndarray) and series.ndim > 1:
-        series = pd.Series(series.ravel())
-    return pd.to_numeric(series, errors='coerce').dropna()
-
 def get_iv(symbol):
     """
     Fetches the implied volatility (IV) from Yahoo Finance's options chain.
@@ -59,25 +59,14 @@ def calculate_rsi(data, window=14):
     """
     Calculates the Relative Strength Index (RSI).
     """
-    delta = data['Close'].diff(1)
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-
-    avg_gain = gain.rolling(window=window).mean()
-    avg_loss = loss.rolling(window=window).mean()
-
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    data['RSI'] = rsi
-    return data
+    return vi.rsi(close_values(data), window)
 
 def calculate_trendline(data):
     """
     Calculates the trendline based on closing prices.
     """
-    data = data.reset_index()
-    x = np.arange(len(data)).reshape(-1, 1)
-    y = data['Close'].values
+    y = close_values(data)
+    x = np.arange(len(y)).reshape(-1, 1)
 
     model = LinearRegression()
     model.fit(x, y)
@@ -89,34 +78,43 @@ def calculate_bollinger_bands(data, window=20, num_std_dev=2):
     """
     Calculates Bollinger Bands based on closing prices.
     """
-    rolling_mean = data['Close'].rolling(window=window).mean()
-    rolling_std = data['Close'].rolling(window=window).std()
-
-    upper_band = rolling_mean + num_std_dev * rolling_std
-    lower_band = rolling_mean - num_std_dev * rolling_std
+    return vi.bollinger_bands(close_values(data), window, num_std_dev)
 
-    return rolling_mean, upper_band, lower_band
-
-def backtest_strategy(data, strike_price, dte):
+def put_option_profits(data, strike_price, dte):
     """
-    Backtests a put-option strategy.
+    Calculates the profit of a put sold at each bar and settled `dte` bars later.
     """
-    profits = []
-    close_prices = data['Close'].values
+    close_prices = close_values(data)
+    if len(close_prices) <= dte:
+        return np.empty(0)
 
-    for i in range(len(close_prices) - dte):
-        option_start_price = close_prices[i]
-        option_end_price = close_prices[i + dte]
+    option_start_prices = close_prices[:-dte] if dte else close_prices
+    option_end_prices = close_prices[dte:]
+    return np.where(option_end_prices >= float(strike_price), option_start_prices * 0.02, strike_price - option_end_prices)
 
-        if float(option_end_price) >= float(strike_price):
-            profit = option_start_price * 0.02
-        else:
-            profit = strike_price - option_end_price
+def backtest_pricing(management=None):
+    """
+    Returns the premium model behind backtest_strategy's profits. Results of different models are not
+    comparable: the plain backtest credits a flat 2 % of the price, managed trades a Black-Scholes premium.
+    """
+    return "black_scholes" if management is not None else "flat_2pct"
 
-        profits.append(profit)
+def backtest_strategy(data, strike_price, dte, entry_mask=None, management=None):
+    """
+    Backtests a put-option strategy. If an entry mask is given, puts are only sold where it is True.
+    With a ManagementRule, each put is marked along its price path and closed or rolled by the rule;
+    these trades are priced with Black-Scholes and not comparable to the plain backtest (see backtest_pricing).
+    """
+    if management is not None:
+        trades = simulate_management(close_values(data), strike_price, dte, management)
+        profits = trades["PnL"].to_numpy()
+    else:
+        profits = put_option_profits(data, strike_price, dte)
+    if entry_mask is not None:
+        profits = profits[np.asarray(entry_mask, dtype=bool)[:len(profits)]]
 
     total_profit = np.sum(profits)
-    avg_profit = np.mean(profits) if profits else 0
+    avg_profit = np.mean(profits) if len(profits) else 0
 
     return total_profit, avg_profit
 
@@ -124,10 +122,10 @@ def generate_put_recommendation(data, support_levels, moving_average_200, iv):
     """
     Generates a put recommendation based on support levels and IV.
     """
-    if support_levels.empty:
+    if len(support_levels) == 0:
         return "No support levels found. Recommendation not possible."
 
-    current_price = float(data['Close'].iloc[-1])
+    current_price = float(close_values(data)[-1])
     nearest_support = min(support_levels, key=lambda x: abs(current_price - x))
     strike_price = round(nearest_support * 0.95, 2)
     dte = 45
@@ -187,6 +185,8 @@ def export_results_and_plot(recommendation, backtest_results, parameters, etf_na
         f"  - Strike Price: {parameters['strike_price']:.2f} USD\n"
         f"  - Duration (DTE): {parameters['dte']} days\n"
     )
+    if parameters.get("entry_rule"):
+        content += f"  - Entry Rule: {parameters['entry_rule']}\n"
     
     rec_content = (
         f"#########################################################################################################\n"
@@ -211,159 +211,137 @@ def export_results_and_plot(recommendation, backtest_results, parameters, etf_na
     print(f"Recommendation successfully exported: {recommendation_filename}")
 
     if fig:
-        fig.savefig(plot_filename, dpi=300)
+        fig.savefig(plot_filename, dpi=PLOT_DPI)
         print(f"Plot image successfully exported: {plot_filename}")
+    else:
+        plot_filename = None
 
-def export_results_to_html(recommendation, backtest_results, parameters, etf_name, folder="results", fig=None):
-    """
-    Exports the results to an HTML file and includes the plot image.
-    """
-    if not os.path.exists(folder):
-        os.makedirs(folder)
+    return results_filename, plot_filename
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_etf_name = etf_name.replace(" ", "_").replace("/", "_")
-    html_filename = os.path.join(folder, f"results_{safe_etf_name}_{timestamp}.html")
-    plot_filename = f"plot_{safe_etf_name}_{timestamp}.png"  # Relative path
-    plot_filepath = os.path.join(folder, plot_filename)      # Full path
-
-    total_profit, avg_profit = backtest_results
-
-    # Save the plot as an image if provided
-    if fig:
-        fig.savefig(plot_filepath, dpi=300)
-        print(f"Plot image successfully saved: {plot_filepath}")
-
-    # Create HTML content
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>ETF Analysis Results - {safe_etf_name}</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 20px; }}
-            h1 {{ color: #333; }}
-            table {{ border-collapse: collapse; width: 100%; margin-top: 20px; }}
-            table, th, td {{ border: 1px solid #ddd; }}
-            th, td {{ padding: 8px; text-align: left; }}
-            th {{ background-color: #f2f2f2; }}
-            .highlight {{ font-weight: bold; color: green; }}
-            img {{ display: block; margin: 20px auto; max-width: 100%; height: auto; }}
-        </style>
-    </head>
-    <body>
-        <h1>ETF Analysis Results</h1>
-        <h2>{safe_etf_name} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</h2>
-        <h3>Recommendation</h3>
-        <pre>{recommendation}</pre>
-        <h3>Backtest Results</h3>
-        <table>
-            <tr>
-                <th>Total Profit</th>
-                <td class="highlight">${total_profit:.2f}</td>
-            </tr>
-            <tr>
-                <th>Average Profit</th>
-                <td class="highlight">${avg_profit:.2f}</td>
-            </tr>
-        </table>
-        <h3>Parameters</h3>
-        <table>
-            <tr>
-                <th>Strike Price</th>
-                <td>${parameters['strike_price']:.2f}</td>
-            </tr>
-            <tr>
-                <th>Duration (DTE)</th>
-                <td>{parameters['dte']} days</td>
-            </tr>
-        </table>
-        <h3>Generated Plot</h3>
-        <img src="{plot_filename}" alt="ETF Analysis Plot">
-    </body>
-    </html>
+def show_stored_plot(plot_filepath, title):
     """
+    Shows a saved chart image in a plot window (used when a run is answered from the results store).
+    """
+    if not plot_filepath or not os.path.exists(plot_filepath):
+        return
+    image = plt.imread(plot_filepath)
+    fig, ax = plt.subplots(figsize=(image.shape[1] / PLOT_DPI, image.shape[0] / PLOT_DPI), dpi=PLOT_DPI)
+    fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
+    ax.imshow(image)
+    ax.axis("off")
+    fig.canvas.manager.set_window_title(title)
+    plt.show(block=False)
+    plt.pause(0.1)
 
-    # Save to an HTML file
-    with open(html_filename, "w") as html_file:
-        html_file.write(html_content)
-
-    print(f"HTML export successfully saved: {html_filename}")
-
-def plot_trends_and_backtest(selected_etf, selected_year):
+def plot_trends_and_backtest(selected_etf, selected_year, chart=None, entry_rule=None, results_db=DEFAULT_RESULTS_DB):
     """
     Plots the chart with trends, RSI, Bollinger Bands, and support/resistance levels.
+    Returns the stored run; identical runs are answered from the results store without re-exporting.
     """
     start_date = f'{selected_year-2}-01-01'
     end_date = f'{selected_year}-12-31'
-    data = yf.download(selected_etf, start=start_date, end=end_date)
+    data = PriceSeries.from_frame(yf.download(selected_etf, start=start_date, end=end_date), selected_etf)
 
-    if 'Close' not in data.columns:
-        raise ValueError(f"The 'Close' column is missing from the downloaded data for {selected_etf}.")
-
-    close_prices = clean_data(data[['Close']])
-    data_for_year = data.loc[f'{selected_year-1}-01-01':f'{selected_year}-12-31']
+    # IV snapshot of the day: reruns on the same day use (and are keyed by) the same value
+    store = ResultsStore(results_db)
+    try:
+        iv = store.daily_iv(selected_etf)
+        if iv is None:
+            iv = get_iv(selected_etf)
+            if iv is not None and np.isfinite(iv):
+                store.record_iv(selected_etf, iv)
+        iv = iv or 0.0
+
+        # Identical inputs (same prices, IV and parameters) return the stored run and its artefacts
+        data_version = f"{data_hash(data.close)}:{iv:.4f}"
+        key = run_key(selected_etf, start_date, end_date, data_version, {"selected_year": selected_year, "entry_rule": entry_rule})
+        stored_run = store.get(key)
+    finally:
+        store.close()
+    if stored_run is not None:
+        print(f"Using stored results for {selected_etf} ({selected_year}): {', '.join(stored_run['artefacts'].values())}")
+        print(f"HTML report: {run_page_path(stored_run)}")
+        show_recommendation_in_window(stored_run["recommendation"])
+        show_stored_plot(stored_run["artefacts"].get("plot"), f"{selected_etf} Trends and Bollinger Bands ({selected_year})")
+        return stored_run
+
+    # Views of the analysis period; indicators over the full history are sliced with the same positions
+    year_start, year_end = data.positions(f'{selected_year-1}-01-01', f'{selected_year}-12-31')
+    data_for_year = data[year_start:year_end]
 
     maxima_points, minima_points = detect_trends(data_for_year)
-    resistance_levels = clean_data(maxima_points['Close']) if not maxima_points.empty else pd.Series([])
-    support_levels = clean_data(minima_points['Close']) if not minima_points.empty else pd.Series([])
+    resistance_levels = maxima_points['Close']
+    support_levels = minima_points['Close']
 
     trendline, slope = calculate_trendline(data_for_year)
     rolling_mean, upper_band, lower_band = calculate_bollinger_bands(data_for_year)
-    moving_average_200 = data['Close'].rolling(window=200).mean()
-    moving_average_200_value = float(moving_average_200.iloc[-1])
-    iv = get_iv(selected_etf) or 0.0
+    moving_average_200 = vi.rolling_mean(data.close, 200)
+    moving_average_200_value = float(moving_average_200[-1])
 
     # Calculate RSI
-    data_for_year = calculate_rsi(data_for_year)
+    rsi = calculate_rsi(data_for_year)
 
     recommendation, strike_price, dte = generate_put_recommendation(data_for_year, support_levels, moving_average_200_value, iv)
 
     show_recommendation_in_window(recommendation)
-    total_profit, avg_profit = backtest_strategy(data_for_year, strike_price=strike_price, dte=dte)
+
+    # Only sell puts where the entry rule holds, e.g. "rsi < 35 and close > ma_200"
+    entry_mask = None
+    if entry_rule:
+        fields = indicator_fields(data_for_year.close, moving_average_200[year_start:year_end])
+        entry_mask = compile_rule(entry_rule)(fields)
+    total_profit, avg_profit = backtest_strategy(data_for_year, strike_price=strike_price, dte=dte, entry_mask=entry_mask)
 
     parameters = {"strike_price": strike_price, "dte": dte}
+    if entry_rule:
+        parameters["entry_rule"] = entry_rule
+
+    # Create plot (the figure skeleton is reused when a chart is passed in, e.g. in batch runs)
+    if chart is None:
+        chart = TrendChart(save_dpi=PLOT_DPI)
+    fig = chart.update(
+        selected_etf,
+        f"{selected_etf} Trends and Bollinger Bands ({selected_year})",
+        data_for_year.index,
+        data_for_year.close,
+        rolling_mean,
+        upper_band,
+        lower_band,
+        moving_average_200[year_start:year_end],
+        trendline,
+        slope,
+        rsi,
+        resistance_levels,
+        support_levels,
+    )
 
-    # Create plot
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 12), gridspec_kw={'height_ratios': [3, 1]})
-
-    # Upper plot: Price and indicators
-    ax1.plot(data_for_year.index, close_prices.loc[data_for_year.index], label=f'{selected_etf} Closing Price', color='blue', alpha=0.6)
-    ax1.plot(data_for_year.index, rolling_mean, label="20-Day Moving Average", color='black', linestyle='--', alpha=0.7)
-    ax1.plot(data_for_year.index, upper_band, label="Upper Bollinger Band", color='purple', linestyle='--', alpha=0.7)
-    ax1.plot(data_for_year.index, lower_band, label="Lower Bollinger Band", color='purple', linestyle='--', alpha=0.7)
-    ax1.plot(data_for_year.index, moving_average_200.loc[data_for_year.index], label="200-Day Moving Average", color='cyan', linestyle='-', linewidth=1.5)
-    ax1.plot(data_for_year.index, trendline, label=f"Trendline (Slope: {slope:.2f})", color='orange', linestyle='-')
- 
-    for level in resistance_levels:
-        ax1.axhline(y=level, color='red', linestyle='--', alpha=0.7)
-    for level in support_levels:
-        ax1.axhline(y=level, color='green', linestyle='--', alpha=0.7)
-
-    ax1.set_title(f"{selected_etf} Trends and Bollinger Bands ({selected_year})")
-    ax1.set_ylabel('Price in USD')
-    ax1.legend(loc='upper left')
-    ax1.grid(True)
-
-    # Lower plot: RSI
-    ax2.plot(data_for_year.index, data_for_year['RSI'], label="RSI", color='darkblue', alpha=0.8)
-    ax2.axhline(70, color='red', linestyle='--', alpha=0.7, label='Overbought (70)')
-    ax2.axhline(30, color='green', linestyle='--', alpha=0.7, label='Oversold (30)')
-    ax2.set_title('Relative Strength Index (RSI)')
-    ax2.set_xlabel('Date')
-    ax2.set_ylabel('RSI')
-    ax2.legend(loc='upper left')
-    ax2.grid(True)
-
-    plt.tight_layout()
-
-    export_results_and_plot(recommendation, (total_profit, avg_profit), parameters, selected_etf, fig=fig)
-    export_results_to_html(recommendation, (total_profit, avg_profit), parameters, selected_etf, fig=fig)
+    results_filename, plot_filename = export_results_and_plot(recommendation, (total_profit, avg_profit), parameters, selected_etf, fig=fig)
+
+    artefacts = {"text": results_filename, "plot": plot_filename}
+    results = {
+        "current_price": float(data.close[-1]),
+        "moving_average_200": moving_average_200_value,
+        "iv": iv,
+        "strike_price": strike_price,
+        "dte": dte,
+        "entry_rule": entry_rule,
+        "total_profit": float(total_profit),
+        "avg_profit": float(avg_profit),
+        "recommendation": recommendation,
+    }
+    store = ResultsStore(results_db)
+    try:
+        stored_run = store.put(key, selected_etf, start_date, end_date, data_version, parameters,
+                               results, {name: path for name, path in artefacts.items() if path})
+    finally:
+        store.close()
+    # The dashboard run page is the HTML report of the run
+    build_dashboard(results_db)
+    print(f"HTML report: {run_page_path(stored_run)}")
 
     plt.show(block=False)
     plt.pause(0.1)
+    return stored_run
 
 def start_selection_window():
     """
@@ -372,15 +350,22 @@ def start_selection_window():
     def on_submit():
         selected_etf = etf_selector.get()
         selected_year = int(year_selector.get())
+        entry_rule = entry_rule_entry.get().strip() or None
+        if entry_rule:
+            try:
+                compile_rule(entry_rule)
+            except ValueError as e:
+                messagebox.showerror("Invalid Entry Rule", str(e))
+                return
         root.destroy()
-        plot_trends_and_backtest(selected_etf, selected_year)
+        plot_trends_and_backtest(selected_etf, selected_year, entry_rule=entry_rule)
 
     root = tk.Tk()
     root.title("Select ETF and Year")
-    root.geometry("400x200")
+    root.geometry("400x280")
 
     tk.Label(root, text="Select ETF:").pack(pady=5)
-    etf_selector = ttk.Combobox(root, values=["IWM", "SPY", "QQQ", "KWEB","ARKK"])
+    etf_selector = ttk.Combobox(root, values=load_universe())
     etf_selector.set("IWM")
     etf_selector.pack(pady=5)
 
@@ -389,6 +374,10 @@ def start_selection_window():
     year_selector.set("2024")
     year_selector.pack(pady=5)
 
+    tk.Label(root, text="Entry Rule (optional, e.g. rsi < 35 and close > ma_200):").pack(pady=5)
+    entry_rule_entry = tk.Entry(root, width=50)
+    entry_rule_entry.pack(pady=5)
+
     submit_button = tk.Button(root, text="Start", command=on_submit)
     submit_button.pack(pady=20)
 
@@ -4,11 +4,11 @@ from tkcalendar import Calendar
 import csv
 from datetime import datetime
 import os
-import pandas as pd
+from dashboard import build_dashboard
 
 def log_put_option_trade_to_html(date, time, action, quantity, symbol, expiry, strike_price, option_type, price, comment):
     """
-    Logs a put option trade to a CSV file and exports it to a well-formatted HTML webpage.
+    Logs a put option trade to the monthly CSV file and updates its page in the dashboard.
     """
     folder = "trades"
     if not os.path.exists(folder):
@@ -16,7 +16,6 @@ def log_put_option_trade_to_html(date, time, action, quantity, symbol, expiry, s
 
     timestamp = datetime.now().strftime("%Y%m")
     log_file = os.path.join(folder, f"option_log_{timestamp}.csv")
-    html_file = os.path.join(folder, f"option_log_{timestamp}.html")
 
     headers = ["Date", "Time", "Action", "Quantity", "Symbol", "Expiry", "Strike Price", "Option Type", "Price", "Comment"]
     entry = [date, time, action, quantity, symbol, expiry, strike_price, option_type, price, comment]
@@ -32,75 +31,11 @@ def log_put_option_trade_to_html(date, time, action, quantity, symbol, expiry, s
 
     print(f"Trade logged: {entry}")
 
-    # Convert CSV to a well-formatted HTML file
+    # The dashboard renders the month's trade page (only the pages of changed logs are rewritten)
     try:
-        df = pd.read_csv(log_file)
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Trade Log - {timestamp}</title>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    margin: 20px;
-                    background-color: #f4f4f9;
-                    color: #333;
-                }}
-                h1 {{
-                    color: #007bff;
-                }}
-                table {{
-                    width: 100%;
-                    border-collapse: collapse;
-                    margin-top: 20px;
-                }}
-                th, td {{
-                    border: 1px solid #ddd;
-                    text-align: left;
-                    padding: 8px;
-                }}
-                th {{
-                    background-color: #007bff;
-                    color: white;
-                }}
-                tr:nth-child(even) {{
-                    background-color: #f9f9f9;
-                }}
-                tr:hover {{
-                    background-color: #f1f1f1;
-                }}
-            </style>
-        </head>
-        <body>
-            <h1>Trade Log for {timestamp}</h1>
-            <table>
-                <thead>
-                    <tr>
-                        {''.join(f"<th>{col}</th>" for col in headers)}
-                    </tr>
-                </thead>
-                <tbody>
-        """
-        for _, row in df.iterrows():
-            html_content += "<tr>" + "".join(f"<td>{value}</td>" for value in row) + "</tr>\n"
-
-        html_content += """
-                </tbody>
-            </table>
-        </body>
-        </html>
-        """
-
-        with open(html_file, "w", encoding="utf-8") as file:
-            file.write(html_content)
-
-        print(f"Trades exported to HTML: {html_file}")
-
+        build_dashboard(trades_folder=folder)
     except Exception as e:
-        print(f"Error exporting to HTML: {e}")
+        print(f"Error updating dashboard: {e}")
 
 def open_calendar():
     """
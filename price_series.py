@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+############################################################################################################
+# Price Series Container
+#
+# One canonical, compact representation of a symbol's daily bars: contiguous float64 arrays with a
+# datetime64 index. Downloaded data is validated and converted once at ingest; date ranges and slices
+# are zero-copy views that the indicators, the backtest and the plotting accept directly.
+############################################################################################################
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class PriceSeries:
+    """
+    Daily bars of one symbol as contiguous NumPy arrays. Slices share memory with the parent.
+    """
+
+    __slots__ = ("symbol", "index") + FIELDS
+
+    def __init__(self, index, open, high, low, close, volume, symbol=None):
+        self.symbol = symbol
+        self.index = index
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_frame(cls, data, symbol=None):
+        """
+        Validates a yfinance-style DataFrame (flat or (Price, Ticker) MultiIndex columns) and converts
+        it into a PriceSeries. Rows without a numeric close are dropped.
+        """
+        if isinstance(data.columns, pd.MultiIndex):
+            tickers = data.columns.get_level_values(-1)
+            if symbol is not None and symbol in tickers:
+                data = data.xs(symbol, axis=1, level=-1)
+            elif tickers.nunique() == 1:
+                data = data.droplevel(-1, axis=1)
+            else:
+                raise ValueError(f"Data contains several tickers; select one of: {', '.join(tickers.unique())}")
+
+        if 'Close' not in data.columns:
+            raise ValueError(f"The 'Close' column is missing from the downloaded data for {symbol}.")
+
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+
+        close = pd.to_numeric(data['Close'], errors='coerce').to_numpy(dtype=np.float64)
+        keep = np.isfinite(close)
+        order = np.argsort(index.asi8[keep], kind='stable')
+
+        def column(name):
+            if name not in data.columns:
+                return np.full(int(keep.sum()), np.nan)
+            values = pd.to_numeric(data[name], errors='coerce').to_numpy(dtype=np.float64)
+            return np.ascontiguousarray(values[keep][order])
+
+        return cls(
+            index.as_unit('ns').to_numpy()[keep][order],
+            column('Open'),
+            column('High'),
+            column('Low'),
+            np.ascontiguousarray(close[keep][order]),
+            column('Volume'),
+            symbol,
+        )
+
+    def __len__(self):
+        return len(self.close)
+
+    @property
+    def empty(self):
+        return len(self.close) == 0
+
+    def __getitem__(self, key):
+        """
+        `series['Close']` returns the column array; a slice returns a view of the bars.
+        """
+        if isinstance(key, str):
+            return getattr(self, key.lower())
+        if isinstance(key, slice):
+            return PriceSeries(*(getattr(self, name)[key] for name in ("index",) + FIELDS), self.symbol)
+        raise TypeError(f"Unsupported key: {key!r}")
+
+    def positions(self, start=None, end=None):
+        """
+        Returns the (start, stop) row positions of a date range (both dates inclusive).
+        """
+        first = 0 if start is None else int(np.searchsorted(self.index, np.datetime64(pd.Timestamp(start)), side='left'))
+        last = len(self) if end is None else int(np.searchsorted(self.index, np.datetime64(pd.Timestamp(end)), side='right'))
+        return first, last
+
+    def between(self, start=None, end=None):
+        """
+        Returns a zero-copy view of the bars within a date range (both dates inclusive).
+        """
+        first, last = self.positions(start, end)
+        return self[first:last]
+
+    def take(self, positions):
+        """
+        Returns the bars at the given row positions (a copy).
+        """
+        return PriceSeries(*(getattr(self, name)[positions] for name in ("index",) + FIELDS), self.symbol)
+
+    def to_frame(self):
+        """
+        Returns the bars as a DataFrame with yfinance column names.
+        """
+        return pd.DataFrame(
+            {name.capitalize(): getattr(self, name) for name in FIELDS},
+            index=pd.DatetimeIndex(self.index, name='Date'),
+        )
+
+def close_values(data):
+    """
+    Returns the closing prices of a PriceSeries, DataFrame or Series as a float64 array.
+    """
+    if isinstance(data, PriceSeries):
+        return data.close
+    if isinstance(data, pd.DataFrame):
+        data = data['Close'] if 'Close' in data.columns else data
+    return np.asarray(data, dtype=np.float64).ravel()
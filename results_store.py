@@ -0,0 +1,201 @@
+import os
+import json
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+import pandas as pd
+
+############################################################################################################
+# Results Store
+#
+# Every analysis run is keyed by a hash of (symbol, date range, data version, parameters). The numeric
+# results and the paths of the exported artefacts are kept in an indexed SQLite table, so identical
+# runs can be answered from the store and past recommendations/backtests can be queried across
+# symbols and months.
+############################################################################################################
+
+DEFAULT_PATH = os.path.join("results", "results.db")
+
+RESULT_FIELDS = (
+    "current_price", "moving_average_200", "iv", "strike_price", "dte", "entry_rule",
+    "total_profit", "avg_profit", "recommendation",
+)
+
+
+def run_key(symbol, start_date, end_date, data_version, parameters):
+    """
+    Returns the content hash identifying an analysis run.
+    """
+    payload = json.dumps(
+        {"symbol": symbol, "start_date": start_date, "end_date": end_date, "data_version": data_version, "parameters": parameters},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResultsStore:
+    """
+    SQLite-backed store of analysis runs.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                key TEXT PRIMARY KEY,
+                symbol TEXT NOT NULL,
+                start_date TEXT,
+                end_date TEXT,
+                month TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                data_version TEXT,
+                parameters TEXT,
+                current_price REAL,
+                moving_average_200 REAL,
+                iv REAL,
+                strike_price REAL,
+                dte INTEGER,
+                entry_rule TEXT,
+                total_profit REAL,
+                avg_profit REAL,
+                recommendation TEXT,
+                artefacts TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_symbol ON runs (symbol, created_at);
+            CREATE INDEX IF NOT EXISTS idx_runs_month ON runs (month, symbol);
+            CREATE TABLE IF NOT EXISTS iv_history (
+                symbol TEXT NOT NULL,
+                date TEXT NOT NULL,
+                iv REAL NOT NULL,
+                PRIMARY KEY (symbol, date)
+            );
+            """
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def _to_record(row):
+        record = dict(row)
+        record["parameters"] = json.loads(record["parameters"] or "{}")
+        record["artefacts"] = json.loads(record["artefacts"] or "{}")
+        return record
+
+    def get(self, key):
+        """
+        Returns the stored run for a key, or None if it is unknown or one of its artefacts is missing.
+        """
+        row = self.connection.execute("SELECT * FROM runs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        record = self._to_record(row)
+        if not all(os.path.exists(path) for path in record["artefacts"].values()):
+            return None
+        return record
+
+    def put(self, key, symbol, start_date, end_date, data_version, parameters, results, artefacts):
+        """
+        Stores (or replaces) a run and returns its record.
+        """
+        now = datetime.now()
+        record = {
+            "key": key,
+            "symbol": symbol,
+            "start_date": start_date,
+            "end_date": end_date,
+            "month": now.strftime("%Y%m"),
+            "created_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "data_version": data_version,
+            "parameters": json.dumps(parameters, sort_keys=True, default=str),
+            "artefacts": json.dumps(artefacts),
+        }
+        record.update({field: results.get(field) for field in RESULT_FIELDS})
+
+        columns = ", ".join(record)
+        placeholders = ", ".join("?" for _ in record)
+        self.connection.execute(f"INSERT OR REPLACE INTO runs ({columns}) VALUES ({placeholders})", tuple(record.values()))
+        self.connection.commit()
+        return self._to_record(record)
+
+    def runs(self):
+        """
+        Returns all stored runs as records, newest first.
+        """
+        rows = self.connection.execute("SELECT * FROM runs ORDER BY created_at DESC").fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def query(self, symbol=None, month=None, since=None, limit=None):
+        """
+        Returns the stored runs as a DataFrame, newest first, optionally filtered by symbol, month
+        (YYYYMM) or creation date (YYYY-MM-DD).
+        """
+        conditions, values = [], []
+        if symbol:
+            conditions.append("symbol = ?")
+            values.append(symbol)
+        if month:
+            conditions.append("month = ?")
+            values.append(month)
+        if since:
+            conditions.append("created_at >= ?")
+            values.append(since)
+
+        sql = "SELECT * FROM runs"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return pd.read_sql_query(sql, self.connection, params=values)
+
+    def record_iv(self, symbol, iv, date=None):
+        """
+        Stores the implied volatility of a symbol for a day (the last value of the day wins).
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        self.connection.execute("INSERT OR REPLACE INTO iv_history (symbol, date, iv) VALUES (?, ?, ?)", (symbol, date, float(iv)))
+        self.connection.commit()
+
+    def daily_iv(self, symbol, date=None):
+        """
+        Returns the implied volatility recorded for a symbol on a day (today by default), or None.
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        row = self.connection.execute("SELECT iv FROM iv_history WHERE symbol = ? AND date = ?", (symbol, date)).fetchone()
+        return row[0] if row else None
+
+    def iv_rank(self, symbol, iv, days=365):
+        """
+        Returns where `iv` lies between the lowest and highest recorded IV of the last `days` days
+        (0 = lowest, 1 = highest), or None while fewer than two distinct values are recorded.
+        """
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        low, high = self.connection.execute(
+            "SELECT MIN(iv), MAX(iv) FROM iv_history WHERE symbol = ? AND date >= ?", (symbol, since)
+        ).fetchone()
+        if low is None or high is None or high <= low:
+            return None
+        return min(max((iv - low) / (high - low), 0.0), 1.0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query stored analysis runs")
+    parser.add_argument("--symbol")
+    parser.add_argument("--month", help="YYYYMM")
+    parser.add_argument("--since", help="YYYY-MM-DD")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    runs = ResultsStore(args.db).query(args.symbol, args.month, args.since, args.limit)
+    columns = ["created_at", "symbol", "current_price", "strike_price", "dte", "iv", "total_profit", "avg_profit", "entry_rule"]
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(runs[columns].to_string(index=False) if not runs.empty else "No stored runs.")
@@ -0,0 +1,194 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.special import ndtr
+import vector_indicators as vi
+
+############################################################################################################
+# Trade-Management Simulation for Short Puts
+#
+# Every entry's price path over its DTE is taken as one row of a windowed (entries x days) matrix.
+# The put is marked with Black-Scholes along the path, and exit rules (profit target, stop-loss,
+# closing at a DTE, rolling down and out when the strike is tested) are evaluated on the whole matrix
+# at once by finding the first day each rule triggers.
+############################################################################################################
+
+TRADING_DAYS_PER_YEAR = 252
+
+# take_profit: close when this fraction of the credit is captured (0.5 = 50 %)
+# stop_loss:   close when the loss reaches this multiple of the credit (2.0 = 200 %)
+# close_dte:   close when this many trading days are left
+# roll:        when the price touches the strike, close and sell a new put with strike roll_strike_pct
+#              of the current price and the full DTE (once per trade)
+ManagementRule = namedtuple(
+    "ManagementRule",
+    ["take_profit", "stop_loss", "close_dte", "roll", "roll_strike_pct"],
+    defaults=[None, None, None, False, 0.95],
+)
+
+EXIT_REASONS = ("expiry", "take_profit", "stop_loss", "close_dte", "roll", "data_end")
+
+
+def put_price(price, strike, years, sigma, rate=0.0):
+    """
+    Calculates the Black-Scholes value of a European put (intrinsic value at expiry).
+    """
+    price, strike, years, sigma = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (price, strike, years, sigma)))
+    intrinsic = np.maximum(strike - price, 0.0)
+    live = (years > 0) & (sigma > 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = sigma * np.sqrt(years)
+        d1 = (np.log(price / strike) + (rate + 0.5 * sigma ** 2) * years) / std
+        d2 = d1 - std
+        value = strike * np.exp(-rate * years) * ndtr(-d2) - price * ndtr(-d1)
+    return np.where(live, value, intrinsic)
+
+def entry_volatility(close, window=21, default=0.2):
+    """
+    Returns the historical volatility known at each bar, used to price the puts.
+    """
+    hist_volatility = vi.historical_volatility(close, window)
+    fallback = np.nanmean(hist_volatility) if np.isfinite(hist_volatility).any() else default
+    return np.where(np.isfinite(hist_volatility), hist_volatility, fallback)
+
+def _first_hit(condition, default):
+    """
+    Returns the first column where a condition holds in each row, or `default` if it never does.
+    """
+    hit = condition.any(axis=1)
+    return np.where(hit, np.argmax(condition, axis=1), default)
+
+def _simulate_leg(close, entries, strikes, sigma, dte, rule, paths=None):
+    """
+    Simulates one leg for every entry index. Returns (pnl, exit day, exit reason index, exit bar).
+    Paths running past the end of the data are closed at the last available bar.
+    """
+    days = np.arange(dte + 1)
+    if paths is None:
+        bars = entries[:, None] + days[None, :]
+        paths = close[np.minimum(bars, len(close) - 1)]
+        last_day = np.minimum(len(close) - 1 - entries, dte)
+    else:
+        last_day = np.full(len(entries), dte)
+
+    years = (dte - days) / TRADING_DAYS_PER_YEAR
+    values = put_price(paths, strikes[:, None], years[None, :], sigma[:, None])
+    credit = values[:, 0]
+
+    # Candidate exit day per reason; the earliest one wins (ties go to the first reason listed)
+    candidates = [last_day]
+    reasons = [np.where(last_day < dte, EXIT_REASONS.index("data_end"), EXIT_REASONS.index("expiry"))]
+    active = days[None, :] >= 1
+    if rule.take_profit is not None:
+        candidates.append(_first_hit(active & (values <= credit[:, None] * (1 - rule.take_profit)), dte))
+        reasons.append(EXIT_REASONS.index("take_profit"))
+    if rule.stop_loss is not None:
+        candidates.append(_first_hit(active & (values >= credit[:, None] * (1 + rule.stop_loss)), dte))
+        reasons.append(EXIT_REASONS.index("stop_loss"))
+    if rule.close_dte is not None:
+        candidates.append(np.full(len(entries), dte - rule.close_dte if dte > rule.close_dte else dte))
+        reasons.append(EXIT_REASONS.index("close_dte"))
+    if rule.roll:
+        candidates.append(_first_hit(active & (paths <= strikes[:, None]), dte))
+        reasons.append(EXIT_REASONS.index("roll"))
+
+    candidates = np.minimum(np.vstack(candidates), last_day[None, :])
+    winner = np.argmin(candidates, axis=0)
+    exit_day = candidates[winner, np.arange(len(entries))]
+    reason_table = np.vstack([np.broadcast_to(reason, len(entries)) for reason in reasons])
+    exit_reason = reason_table[winner, np.arange(len(entries))]
+    # A rule firing on the last day of the path is just an expiry (or end of data)
+    exit_reason = np.where((exit_day == last_day) & (candidates[0] == exit_day), reason_table[0], exit_reason)
+
+    pnl = credit - values[np.arange(len(entries)), exit_day]
+    return pnl, exit_day, exit_reason, entries + exit_day
+
+def simulate_management(close, strikes, dte, rule, sigma=None):
+    """
+    Simulates a short put opened at every bar that has a full `dte` path ahead and managed by `rule`.
+    Returns a DataFrame with one row per entry (pnl per share, days held, exit reason).
+    """
+    close = np.asarray(close, dtype=np.float64).ravel()
+    entries = np.arange(max(len(close) - dte, 0))
+    if len(entries) == 0:
+        return pd.DataFrame({
+            "Entry": entries,
+            "PnL": np.empty(0),
+            "Days Held": np.empty(0, dtype=np.int64),
+            "Exit Reason": np.empty(0, dtype=object),
+        })
+    strikes = np.broadcast_to(np.asarray(strikes, dtype=np.float64), close.shape)[entries]
+    sigma = entry_volatility(close) if sigma is None else np.broadcast_to(np.asarray(sigma, dtype=np.float64), close.shape)
+
+    paths = sliding_window_view(close, dte + 1)[:len(entries)]
+    pnl, days_held, reason, exit_bars = _simulate_leg(close, entries, strikes, sigma[entries], dte, rule, paths)
+
+    # Rolled trades continue with a new put from the exit bar (no further rolls)
+    rolled = reason == EXIT_REASONS.index("roll")
+    if rolled.any():
+        roll_entries = exit_bars[rolled]
+        roll_strikes = close[roll_entries] * rule.roll_strike_pct
+        roll_rule = rule._replace(roll=False)
+        roll_pnl, roll_days, _, _ = _simulate_leg(close, roll_entries, roll_strikes, sigma[roll_entries], dte, roll_rule)
+        pnl[rolled] += roll_pnl
+        days_held[rolled] += roll_days
+
+    return pd.DataFrame({
+        "Entry": entries,
+        "PnL": pnl,
+        "Days Held": days_held,
+        "Exit Reason": np.asarray(EXIT_REASONS)[reason],
+    })
+
+def compare_management_rules(close, strikes, dte, rules, sigma=None, entry_mask=None):
+    """
+    Simulates several management rules on the same entries and returns one summary row per rule.
+    """
+    close = np.asarray(close, dtype=np.float64).ravel()
+    sigma = entry_volatility(close) if sigma is None else sigma
+
+    rows = []
+    for rule in rules:
+        trades = simulate_management(close, strikes, dte, rule, sigma)
+        if entry_mask is not None:
+            trades = trades[np.asarray(entry_mask, dtype=bool)[trades["Entry"].to_numpy()]]
+        row = {
+            "Rule": describe_rule(rule),
+            "Trades": len(trades),
+            "Total Profit": trades["PnL"].sum(),
+            "Average Profit": trades["PnL"].mean() if len(trades) else 0,
+            "Win Rate": (trades["PnL"] > 0).mean() if len(trades) else 0,
+            "Avg Days Held": trades["Days Held"].mean() if len(trades) else 0,
+        }
+        row.update({f"Exits {reason}": int((trades["Exit Reason"] == reason).sum()) for reason in EXIT_REASONS})
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values("Total Profit", ascending=False, ignore_index=True)
+
+def describe_rule(rule):
+    """
+    Returns a short label for a management rule.
+    """
+    parts = []
+    if rule.take_profit is not None:
+        parts.append(f"TP {rule.take_profit:.0%}")
+    if rule.stop_loss is not None:
+        parts.append(f"SL {rule.stop_loss:.0%}")
+    if rule.close_dte is not None:
+        parts.append(f"Close {rule.close_dte} DTE")
+    if rule.roll:
+        parts.append(f"Roll {rule.roll_strike_pct:.0%}")
+    return ", ".join(parts) or "Hold to expiry"
+
+def management_grid(take_profits=(None, 0.5, 0.75), stop_losses=(None, 1.0, 2.0), close_dtes=(None, 21), rolls=(False, True)):
+    """
+    Builds all combinations of the given management parameters.
+    """
+    return [
+        ManagementRule(take_profit, stop_loss, close_dte, roll)
+        for take_profit in take_profits
+        for stop_loss in stop_losses
+        for close_dte in close_dtes
+        for roll in rolls
+    ]
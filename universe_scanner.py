@@ -0,0 +1,140 @@
+import os
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import yfinance as yf
+import vector_indicators as vi
+
+############################################################################################################
+# Universe Scanner for Put-Selling Candidates
+#
+# Loads the closing prices of a whole ETF universe into one dates x tickers matrix and computes RSI,
+# historical volatility, distance to the 200-day average, the nearest support level and the put
+# recommendation for all tickers at once.
+############################################################################################################
+
+DEFAULT_UNIVERSE = ["IWM", "SPY", "QQQ", "KWEB", "ARKK"]
+UNIVERSE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "universe.txt")
+
+
+def load_universe(path=UNIVERSE_FILE):
+    """
+    Loads the ticker universe from a text file (one ticker per line, '#' starts a comment).
+    Falls back to the default ETFs if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return list(DEFAULT_UNIVERSE)
+
+    symbols = []
+    with open(path) as file:
+        for line in file:
+            symbol = line.split("#", 1)[0].strip().upper()
+            if symbol and symbol not in symbols:
+                symbols.append(symbol)
+    return symbols or list(DEFAULT_UNIVERSE)
+
+def download_close_matrix(symbols, years=2):
+    """
+    Downloads daily closing prices for all symbols into a dates x tickers DataFrame.
+    """
+    start_date = (datetime.now() - timedelta(days=int(365 * years) + 300)).strftime("%Y-%m-%d")
+    data = yf.download(symbols, start=start_date, progress=False, threads=True)
+    close = data["Close"]
+    if isinstance(close, pd.Series):
+        close = close.to_frame(symbols[0])
+    return close.reindex(columns=symbols).dropna(how="all")
+
+def nearest_support(close, lookback=504, order=5):
+    """
+    Finds the local minima (strictly lower than `order` bars on each side) within the last `lookback`
+    rows of each column and returns the one closest to the current price (NaN if there is none).
+    """
+    window = np.asarray(close, dtype=np.float64)[-lookback:]
+    n = len(window)
+    is_minimum = np.zeros(window.shape, dtype=bool)
+    if n > 2 * order:
+        center = window[order:n - order]
+        is_minimum[order:n - order] = np.isfinite(center)
+        for shift in range(1, order + 1):
+            is_minimum[order:n - order] &= center < window[order - shift:n - order - shift]
+            is_minimum[order:n - order] &= center < window[order + shift:n - order + shift]
+
+    levels = np.where(is_minimum, window, np.nan)
+    current_price = last_valid(window)
+    distance = np.where(is_minimum, np.abs(levels - current_price), np.inf)
+    nearest = np.take_along_axis(levels, np.argmin(distance, axis=0)[None, :], axis=0)[0]
+    return np.where(is_minimum.any(axis=0), nearest, np.nan)
+
+def last_valid(values):
+    """
+    Returns the last non-missing value of each column.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.isfinite(values)
+    last_index = len(values) - 1 - np.argmax(valid[::-1], axis=0)
+    result = np.take_along_axis(values, last_index[None, :], axis=0)[0]
+    return np.where(valid.any(axis=0), result, np.nan)
+
+def scan_universe(close, strike_factor=0.95, dte=45):
+    """
+    Computes the put-selling indicators for every column of a dates x tickers close matrix and returns
+    a table ranked by score.
+
+    The score favours rich premiums (historical volatility), a large cushion between price and strike,
+    an uptrend (price above the 200-day average) and pullbacks (low RSI).
+    """
+    values = close.to_numpy(dtype=np.float64)
+
+    current_price = last_valid(values)
+    rsi = last_valid(vi.rsi(values))
+    hist_volatility = last_valid(vi.historical_volatility(values))
+    moving_average_200 = last_valid(vi.rolling_mean(values, 200))
+    support = nearest_support(values)
+
+    strike_price = np.round(support * strike_factor, 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ma_distance = current_price / moving_average_200 - 1
+        cushion = 1 - strike_price / current_price
+
+    above_ma = ma_distance > 0
+    score = hist_volatility * np.clip(cushion, 0, None) * np.where(above_ma, 1.0, 0.5) * (1 + (50 - rsi) / 100)
+    recommendation = np.where(
+        np.isnan(support),
+        "No support",
+        np.where(above_ma & (rsi < 70), "Sell Put", "Wait"),
+    )
+
+    table = pd.DataFrame({
+        "ETF": close.columns,
+        "Close Price": current_price,
+        "RSI": rsi,
+        "Hist Volatility": hist_volatility,
+        "200-Day MA": moving_average_200,
+        "MA Distance": ma_distance,
+        "Nearest Support": support,
+        "Strike Price": strike_price,
+        "DTE": dte,
+        "Cushion": cushion,
+        "Recommendation": recommendation,
+        "Score": score,
+    })
+    table = table[np.isfinite(current_price)]
+    return table.sort_values("Score", ascending=False, na_position="last", ignore_index=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank an ETF universe for put selling")
+    parser.add_argument("--universe", default=UNIVERSE_FILE, help="text file with one ticker per line")
+    parser.add_argument("--top", type=int, default=25, help="number of candidates to print")
+    parser.add_argument("--csv", help="optional path to save the full ranking as CSV")
+    args = parser.parse_args()
+
+    symbols = load_universe(args.universe)
+    print(f"Scanning {len(symbols)} symbols...")
+    ranking = scan_universe(download_close_matrix(symbols))
+
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format", "{:.4f}".format):
+        print(ranking.head(args.top).to_string())
+    if args.csv:
+        ranking.to_csv(args.csv, index=False)
+        print(f"Ranking saved: {args.csv}")
@@ -0,0 +1,168 @@
+import numpy as np
+
+############################################################################################################
+# Array-Based Indicators
+#
+# Plain NumPy versions of the indicators used across the tools. All functions work on 1-D arrays
+# (one symbol) as well as 2-D arrays shaped dates x tickers, computing along the first axis.
+# Missing values (NaN) are allowed; a rolling value is only produced when its whole window is valid.
+############################################################################################################
+
+
+def _prepend_zero_row(values):
+    """
+    Prepends a row of zeros along the first axis (used for cumulative-sum differences).
+    """
+    return np.concatenate((np.zeros((1,) + values.shape[1:], dtype=values.dtype), values), axis=0)
+
+def rolling_sum(values, window):
+    """
+    Calculates the rolling sum over `window` rows and the number of valid rows in each window.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if window > len(values):
+        return out, np.zeros(values.shape, dtype=np.int64)
+
+    valid = np.isfinite(values)
+    cum_values = _prepend_zero_row(np.cumsum(np.where(valid, values, 0.0), axis=0))
+    cum_valid = _prepend_zero_row(np.cumsum(valid, axis=0, dtype=np.int64))
+
+    counts = np.zeros(values.shape, dtype=np.int64)
+    out[window - 1:] = cum_values[window:] - cum_values[:-window]
+    counts[window - 1:] = cum_valid[window:] - cum_valid[:-window]
+    return out, counts
+
+def rolling_mean(values, window):
+    """
+    Calculates the simple moving average over `window` rows.
+    """
+    sums, counts = rolling_sum(values, window)
+    return np.where(counts == window, sums / window, np.nan)
+
+def rolling_std(values, window, ddof=1):
+    """
+    Calculates the rolling standard deviation over `window` rows.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    sums, counts = rolling_sum(values, window)
+    squares, _ = rolling_sum(values * values, window)
+    variance = (squares - sums * sums / window) / (window - ddof)
+    return np.where(counts == window, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+def diff(values):
+    """
+    Calculates the first difference along the first axis, keeping the input length (first row is NaN).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty(values.shape)
+    out[0] = np.nan
+    out[1:] = values[1:] - values[:-1]
+    return out
+
+def rsi(close, window=14):
+    """
+    Calculates the Relative Strength Index (RSI) with simple moving averages of gains and losses.
+    """
+    # Like pandas' `where(delta > 0, 0)`, a missing change counts as no gain and no loss
+    delta = diff(close)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+
+    avg_gain = rolling_mean(gain, window)
+    avg_loss = rolling_mean(loss, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+def bollinger_bands(close, window=20, num_std_dev=2):
+    """
+    Calculates the rolling mean with upper and lower Bollinger Bands.
+    """
+    mean = rolling_mean(close, window)
+    std = rolling_std(close, window)
+    return mean, mean + num_std_dev * std, mean - num_std_dev * std
+
+def log_returns(close):
+    """
+    Calculates logarithmic returns along the first axis (first row is NaN).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    out = np.empty(close.shape)
+    out[0] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[1:] = np.log(close[1:] / close[:-1])
+    return out
+
+def historical_volatility(close, window=21, periods_per_year=252):
+    """
+    Calculates the annualized close-to-close historical volatility.
+    """
+    return rolling_std(log_returns(close), window) * np.sqrt(periods_per_year)
+
+def _log_ohlc(open_, high, low, close):
+    """
+    Returns the log price ratios shared by the range-based volatility estimators.
+    """
+    open_, high, low, close = (np.asarray(values, dtype=np.float64) for values in (open_, high, low, close))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_high_low = np.log(high / low)
+        log_close_open = np.log(close / open_)
+        rogers_satchell = np.log(high / close) * np.log(high / open_) + np.log(low / close) * np.log(low / open_)
+        overnight = np.full(close.shape, np.nan)
+        overnight[1:] = np.log(open_[1:] / close[:-1])
+    return log_high_low, log_close_open, rogers_satchell, overnight
+
+def parkinson_volatility(high, low, window=21, periods_per_year=252):
+    """
+    Calculates the annualized Parkinson volatility from the high-low range.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_high_low = np.log(np.asarray(high, dtype=np.float64) / np.asarray(low, dtype=np.float64))
+    return np.sqrt(rolling_mean(log_high_low ** 2, window) / (4 * np.log(2)) * periods_per_year)
+
+def garman_klass_volatility(open_, high, low, close, window=21, periods_per_year=252):
+    """
+    Calculates the annualized Garman-Klass volatility.
+    """
+    log_high_low, log_close_open, _, _ = _log_ohlc(open_, high, low, close)
+    terms = 0.5 * log_high_low ** 2 - (2 * np.log(2) - 1) * log_close_open ** 2
+    return np.sqrt(np.maximum(rolling_mean(terms, window), 0.0) * periods_per_year)
+
+def rogers_satchell_volatility(open_, high, low, close, window=21, periods_per_year=252):
+    """
+    Calculates the annualized Rogers-Satchell volatility (robust to drift).
+    """
+    _, _, rogers_satchell, _ = _log_ohlc(open_, high, low, close)
+    return np.sqrt(np.maximum(rolling_mean(rogers_satchell, window), 0.0) * periods_per_year)
+
+def yang_zhang_volatility(open_, high, low, close, window=21, periods_per_year=252):
+    """
+    Calculates the annualized Yang-Zhang volatility (overnight, open-to-close and Rogers-Satchell parts).
+    """
+    _, log_close_open, rogers_satchell, overnight = _log_ohlc(open_, high, low, close)
+    return _yang_zhang(log_close_open, rogers_satchell, overnight, window, periods_per_year)
+
+def _yang_zhang(log_close_open, rogers_satchell, overnight, window, periods_per_year):
+    k = 0.34 / (1.34 + (window + 1) / (window - 1))
+    variance = rolling_std(overnight, window) ** 2 + k * rolling_std(log_close_open, window) ** 2 + (1 - k) * rolling_mean(rogers_satchell, window)
+    return np.sqrt(np.maximum(variance, 0.0) * periods_per_year)
+
+def realized_volatility(open_, high, low, close, windows=(10, 21, 63), periods_per_year=252):
+    """
+    Calculates all volatility estimators for several windows, sharing the log price ratios.
+    Returns {(estimator, window): array} with estimators "close", "parkinson", "garman_klass",
+    "rogers_satchell" and "yang_zhang".
+    """
+    log_high_low, log_close_open, rogers_satchell, overnight = _log_ohlc(open_, high, low, close)
+    close_returns = log_returns(close)
+    garman_klass = 0.5 * log_high_low ** 2 - (2 * np.log(2) - 1) * log_close_open ** 2
+
+    estimates = {}
+    for window in windows:
+        estimates[("close", window)] = rolling_std(close_returns, window) * np.sqrt(periods_per_year)
+        estimates[("parkinson", window)] = np.sqrt(rolling_mean(log_high_low ** 2, window) / (4 * np.log(2)) * periods_per_year)
+        estimates[("garman_klass", window)] = np.sqrt(np.maximum(rolling_mean(garman_klass, window), 0.0) * periods_per_year)
+        estimates[("rogers_satchell", window)] = np.sqrt(np.maximum(rolling_mean(rogers_satchell, window), 0.0) * periods_per_year)
+        estimates[("yang_zhang", window)] = _yang_zhang(log_close_open, rogers_satchell, overnight, window, periods_per_year)
+    return estimates